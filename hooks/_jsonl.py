@@ -0,0 +1,207 @@
+"""
+JSONL Writer
+
+Shared JSON encoding and log appender for the VSM hook scripts.
+
+Several hooks can run concurrently against the same log, so every record
+goes down as one write() on an O_APPEND descriptor. The kernel positions
+each such write at end-of-file, which keeps lines from interleaving.
+Each write is made under the same flock() the roller takes, after checking
+that the descriptor still refers to the live file, so no record lands in
+a segment that has already been rolled away.
+
+append_line() writes immediately. enqueue() buffers entries in memory and
+drains them in a single write every FLUSH_INTERVAL seconds, once
+FLUSH_EVENTS entries are pending, or when the process exits.
+
+Once a log grows past LOG_ROLL_BYTES it is renamed to a timestamped
+segment (execution-log.YYYYMMDD-HHMMSS.jsonl) which is gzipped in the
+background, and a fresh live file is started. The size is checked when a
+log is first opened and after each flush.
+"""
+
+import atexit
+import fcntl
+import gzip
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+    import json
+
+
+FLUSH_INTERVAL = 0.1  # seconds
+FLUSH_EVENTS = 64
+LOG_ROLL_BYTES = 8 * 1024 * 1024
+
+_BUFFER: dict[Path, list[bytes]] = {}
+_LOCK = threading.Lock()
+_FDS: dict[Path, int] = {}
+_flusher: Optional[threading.Thread] = None
+
+
+def now_iso() -> str:
+    """Current UTC time as an ISO 8601 string with millisecond precision."""
+    return datetime.fromtimestamp(time.time(), tz=timezone.utc).isoformat(
+        timespec="milliseconds"
+    )
+
+
+def encode(entry: dict) -> bytes:
+    """Serialize an entry as a single newline-terminated JSONL record."""
+    if orjson is not None:
+        return orjson.dumps(entry) + b"\n"
+    return json.dumps(entry).encode() + b"\n"
+
+
+def loads(data: bytes) -> dict:
+    """Parse a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _open(path: Path) -> int:
+    return os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+
+def _compress(segment: Path) -> None:
+    """Gzip a rolled segment and remove the uncompressed copy."""
+    target = segment.with_name(segment.name + ".gz")
+    partial = segment.with_name(segment.name + ".gz.tmp")
+    with open(segment, "rb") as src, gzip.open(partial, "wb", compresslevel=1) as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(partial, target)
+    segment.unlink()
+
+
+def _claim_segment(path: Path) -> Path:
+    """Hard-link the live log to a fresh timestamped segment name."""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+    name = f"{path.stem}.{stamp}"
+    n = 0
+    while True:
+        segment = path.with_name(f"{name}{path.suffix}")
+        if not segment.with_name(segment.name + ".gz").exists():
+            try:
+                # link() never replaces an existing file, unlike rename()
+                os.link(path, segment)
+                return segment
+            except FileExistsError:
+                pass
+        n += 1
+        name = f"{path.stem}.{stamp}-{n}"
+
+
+def _maybe_roll(path: Path, fd: int) -> int:
+    """
+    Roll the log over if it has outgrown LOG_ROLL_BYTES.
+
+    Returns the descriptor to keep writing to. Concurrent writers serialize
+    on a lock held on the old file; a writer that finds the path no longer
+    refers to its descriptor just reopens, since someone else rolled it.
+    """
+    if os.fstat(fd).st_size <= LOG_ROLL_BYTES:
+        return fd
+
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        try:
+            current = os.stat(path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current == os.fstat(fd).st_ino:
+            segment = _claim_segment(path)
+            os.unlink(path)
+            # Not a daemon: a one-shot hook waits for its segment to finish
+            threading.Thread(target=_compress, args=(segment,)).start()
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+    os.close(fd)
+    fd = _open(path)
+    _FDS[path] = fd
+    return fd
+
+
+def _fd(path: Path) -> int:
+    """Get the append-mode descriptor for a log, opening it on first use."""
+    fd = _FDS.get(path)
+    if fd is None:
+        fd = _maybe_roll(path, _open(path))
+        _FDS[path] = fd
+    return fd
+
+
+def _locked_fd(path: Path) -> int:
+    """
+    Get the descriptor for a log with an exclusive lock held on it.
+
+    Holding the lock keeps the file from being rolled, and a descriptor
+    found to be left over from an earlier roll is swapped for the live file.
+    """
+    fd = _fd(path)
+    while True:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            current = os.stat(path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current == os.fstat(fd).st_ino:
+            return fd
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+        fd = _open(path)
+        _FDS[path] = fd
+
+
+def append_line(path: Path, line: bytes) -> None:
+    """Append a complete, newline-terminated record with a single write."""
+    fd = _locked_fd(path)
+    try:
+        os.write(fd, line)
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def flush() -> None:
+    """Drain all pending entries to disk."""
+    with _LOCK:
+        for path, batch in _BUFFER.items():
+            if batch:
+                append_line(path, b"".join(batch))
+                batch.clear()
+                _maybe_roll(path, _FDS[path])
+
+
+def _run_flusher() -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush()
+
+
+def enqueue(path: Path, line: bytes) -> None:
+    """Queue a pre-serialized line for appending to a log file."""
+    global _flusher
+
+    with _LOCK:
+        batch = _BUFFER.setdefault(path, [])
+        batch.append(line)
+        pending = len(batch)
+        if _flusher is None:
+            _flusher = threading.Thread(target=_run_flusher, daemon=True)
+            _flusher.start()
+
+    if pending >= FLUSH_EVENTS:
+        flush()
+
+
+atexit.register(flush)
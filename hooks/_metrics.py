@@ -0,0 +1,125 @@
+"""
+Metrics Store
+
+Cached access to viability-metrics.json for the VSM hook scripts.
+
+The file is mapped and parsed once per process. Updates mutate the
+in-memory document and mark it dirty; a background flusher writes it back
+every FLUSH_INTERVAL seconds (and at exit), and only when its content has
+changed. Each write goes to a temporary file that then replaces the
+original, so readers never see a partially rewritten document.
+"""
+
+import atexit
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from _jsonl import FLUSH_INTERVAL, encode, loads, now_iso
+
+# Error-rate changes smaller than this are not worth rewriting the file for
+EPSILON = 1e-6
+
+# Exponential moving average weight for agent error rates
+ALPHA = 0.2
+
+
+def default_metrics() -> dict:
+    """Metrics document used when the file is missing or unreadable."""
+    return {
+        "window": "last_10_tasks",
+        "completion_rate": 1.0,
+        "agent_errors": {},
+        "oscillation_rate": 0.0,
+        "audit_pass_rate": 1.0,
+        "s3_s4_conflicts": 0,
+        "avg_cycle_iterations": 1.0,
+        "active_adaptations": {},
+        "last_updated": ""
+    }
+
+
+class MetricsStore:
+    """viability-metrics.json held in memory between writes."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._flusher: Optional[threading.Thread] = None
+        self.data = self._read()
+        # Content (without timestamp) currently on disk
+        self._saved = self._snapshot()
+        atexit.register(self.flush)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return default_metrics()  # empty files cannot be mapped
+                with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as view:
+                    return loads(view[:])
+        except (OSError, ValueError):
+            return default_metrics()
+
+    def _snapshot(self) -> bytes:
+        return encode({k: v for k, v in self.data.items() if k != "last_updated"})
+
+    def save(self, timestamp: Optional[str] = None) -> None:
+        """
+        Write the document back, stamping it with the given (or current) time.
+
+        Skips the write when the content matches what is already on disk.
+        """
+        with self._lock:
+            self._dirty = False
+            snapshot = self._snapshot()
+            if snapshot == self._saved:
+                return
+
+            self.data["last_updated"] = timestamp or now_iso()
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(encode(self.data))
+            os.replace(tmp, self.path)
+            self._saved = snapshot
+
+    def flush(self, timestamp: Optional[str] = None) -> None:
+        """Persist pending updates, if any."""
+        if self._dirty:
+            self.save(timestamp)
+
+    def _run_flusher(self) -> None:
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+
+    def mark_dirty(self) -> None:
+        """Schedule the in-memory document for the next flush."""
+        with self._lock:
+            self._dirty = True
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, daemon=True)
+                self._flusher.start()
+
+    def update_agent_error(self, agent: str, is_error: bool) -> float:
+        """
+        Fold one completion into an agent's error rate.
+
+        Returns the new rate. Steady rates (e.g. repeated successes at 0.0)
+        leave the store clean so no rewrite happens.
+        """
+        with self._lock:
+            errors = self.data.setdefault("agent_errors", {})
+            old_rate = errors.get(agent)
+
+            error_value = 1.0 if is_error else 0.0
+            new_rate = ALPHA * error_value + (1 - ALPHA) * (old_rate or 0.0)
+            errors[agent] = new_rate
+
+            if old_rate is None or abs(new_rate - old_rate) >= EPSILON:
+                self.mark_dirty()
+        return new_rate
@@ -0,0 +1,38 @@
+"""
+State Paths
+
+Resolves the VSM state directory shared by the hook scripts.
+
+The directory is resolved and created on first use and then cached for
+the rest of the process, so repeated lookups cost no getcwd() or mkdir()
+calls.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=1)
+def state_dir() -> Path:
+    """Get the VSM state directory, creating it if necessary."""
+    path = Path.cwd() / ".claude" / "vsm-state"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@lru_cache(maxsize=1)
+def log_file() -> Path:
+    """Get the VSM execution log file path."""
+    return state_dir() / "execution-log.jsonl"
+
+
+@lru_cache(maxsize=1)
+def metrics_file() -> Path:
+    """Get the VSM metrics file path."""
+    return state_dir() / "viability-metrics.json"
+
+
+@lru_cache(maxsize=1)
+def socket_file() -> Path:
+    """Get the logger daemon's socket path."""
+    return state_dir() / "log.sock"
@@ -3,36 +3,89 @@
 Log Action Hook
 
 Logs tool usage for VSM observability.
+
+Entries are handed to the vsm_logd daemon over its Unix socket. If no
+daemon is listening the entry is appended directly and a daemon is
+started for the events that follow.
+
+This runs on every tool event, so the path to the daemon imports nothing
+beyond socket: the entry is encoded here rather than through _jsonl, and
+the modules needed to append or spawn are only loaded when that happens.
 """
 
-import json
 import os
+import socket
 import sys
-from datetime import datetime
-from pathlib import Path
+import time
+
+try:
+    from _json import encode_basestring_ascii as _quote
+except ImportError:  # no C accelerator; the pure-Python json one will do
+    from json.encoder import encode_basestring_ascii as _quote
+
+# The daemon's socket, as resolved by _paths.socket_file(), relative to
+# the project directory hooks run in
+SOCKET = os.path.join(".claude", "vsm-state", "log.sock")
+DAEMON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vsm_logd.py")
+
+
+def _now_iso() -> str:
+    """Same format as _jsonl.now_iso(), without importing datetime."""
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+    return f"{stamp}.{nanos // 1_000_000:03d}+00:00"
+
 
+def _encode(entry: dict) -> bytes:
+    """Serialize a flat entry of strings as a newline-terminated JSON line."""
+    fields = ", ".join(f"{_quote(k)}: {_quote(v)}" for k, v in entry.items())
+    return f"{{{fields}}}\n".encode()
 
-def get_log_file() -> Path:
-    """Get the VSM execution log file path."""
-    state_dir = Path.cwd() / ".claude" / "vsm-state"
-    state_dir.mkdir(parents=True, exist_ok=True)
-    return state_dir / "execution-log.jsonl"
+
+def _spawn_daemon() -> None:
+    """Start the logger daemon detached from this hook."""
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, DAEMON],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def _send(line: bytes) -> None:
+    """Send a line to the daemon, falling back to a direct append."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        sock.sendto(line, SOCKET)
+        return
+    except (FileNotFoundError, ConnectionRefusedError):
+        _spawn_daemon()
+    except OSError:
+        pass  # daemon busy or line too large for a datagram
+    finally:
+        sock.close()
+
+    from _jsonl import append_line
+    from _paths import log_file
+
+    append_line(log_file(), line)
 
 
 def log_action(tool_name: str, tool_input: str) -> None:
     """Log a tool action."""
-    log_file = get_log_file()
-
     entry = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _now_iso(),
         "event_type": "tool_used",
         "tool_name": tool_name,
         "input_preview": tool_input[:200] if tool_input else "",
         "session_id": os.environ.get("CLAUDE_SESSION_ID", "unknown")
     }
 
-    with open(log_file, 'a') as f:
-        f.write(json.dumps(entry) + "\n")
+    _send(_encode(entry))
 
 
 if __name__ == "__main__":
@@ -5,46 +5,42 @@ Log System Agent Hook
 Logs higher-level VSM system agent (S2-S5) completions.
 """
 
-import json
 import sys
-from datetime import datetime
-from pathlib import Path
 
+from _jsonl import append_line, encode, now_iso
+from _paths import log_file
 
-def get_log_file() -> Path:
-    """Get the VSM execution log file path."""
-    state_dir = Path.cwd() / ".claude" / "vsm-state"
-    state_dir.mkdir(parents=True, exist_ok=True)
-    return state_dir / "execution-log.jsonl"
+# (substring, level) pairs checked in order; the first match wins
+_LEVEL_RULES = (
+    ("system5", "S5-Policy"),
+    ("policy", "S5-Policy"),
+    ("system4", "S4-Intelligence"),
+    ("strategy", "S4-Intelligence"),
+    ("audit", "S3*-Audit"),
+    ("system3", "S3-Control"),
+    ("control", "S3-Control"),
+    ("system2", "S2-Coordination"),
+    ("coordination", "S2-Coordination"),
+)
 
 
 def log_system_agent(agent_name: str, status: str) -> None:
     """Log a system agent completion."""
-    log_file = get_log_file()
-
     # Determine the VSM system level
-    system_level = "unknown"
-    if "system5" in agent_name or "policy" in agent_name:
-        system_level = "S5-Policy"
-    elif "system4" in agent_name or "strategy" in agent_name:
-        system_level = "S4-Intelligence"
-    elif "audit" in agent_name or "system3-audit" in agent_name:
-        system_level = "S3*-Audit"
-    elif "system3" in agent_name or "control" in agent_name:
-        system_level = "S3-Control"
-    elif "system2" in agent_name or "coordination" in agent_name:
-        system_level = "S2-Coordination"
+    system_level = next(
+        (level for token, level in _LEVEL_RULES if token in agent_name),
+        "unknown"
+    )
 
     entry = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": now_iso(),
         "event_type": "system_agent_completed",
         "agent": agent_name,
         "system_level": system_level,
         "status": status
     }
 
-    with open(log_file, 'a') as f:
-        f.write(json.dumps(entry) + "\n")
+    append_line(log_file(), encode(entry))
 
 
 if __name__ == "__main__":
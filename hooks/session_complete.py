@@ -6,53 +6,46 @@ Called when a VSM session completes.
 Updates final metrics and logs session end.
 """
 
-import json
-from datetime import datetime
-from pathlib import Path
+import os
 
+from _jsonl import append_line, encode, loads, now_iso
+from _paths import log_file, metrics_file, state_dir
 
-def get_state_dir() -> Path:
-    """Get the VSM state directory."""
-    state_dir = Path.cwd() / ".claude" / "vsm-state"
-    state_dir.mkdir(parents=True, exist_ok=True)
-    return state_dir
+
+def _read(path) -> dict | None:
+    """Read a state file, or None if it is missing or unreadable."""
+    try:
+        return loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
 
 
 def log_session_complete() -> None:
     """Log session completion and update metrics."""
-    state_dir = get_state_dir()
-    log_file = state_dir / "execution-log.jsonl"
-    metrics_file = state_dir / "viability-metrics.json"
+    metrics_path = metrics_file()
+    task_file = state_dir() / "current-task.json"
+    now = now_iso()
 
     # Log session end
     entry = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": now,
         "event_type": "session_complete"
     }
-    with open(log_file, 'a') as f:
-        f.write(json.dumps(entry) + "\n")
-
-    # Update metrics timestamp
-    if metrics_file.exists():
-        try:
-            with open(metrics_file, 'r') as f:
-                metrics = json.load(f)
-            metrics["last_updated"] = datetime.utcnow().isoformat()
-            with open(metrics_file, 'w') as f:
-                json.dump(metrics, f, indent=2)
-        except:
-            pass
+    append_line(log_file(), encode(entry))
+
+    # Update metrics timestamp, replacing the file atomically so readers
+    # never see a partial write
+    metrics = _read(metrics_path)
+    if metrics is not None:
+        metrics["last_updated"] = now
+        tmp = metrics_path.with_name(f"{metrics_path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(encode(metrics))
+        os.replace(tmp, metrics_path)
 
     # Clear current task if completed
-    task_file = state_dir / "current-task.json"
-    if task_file.exists():
-        try:
-            with open(task_file, 'r') as f:
-                task = json.load(f)
-            if task.get("status") in ["completed", "failed"]:
-                task_file.unlink()
-        except:
-            pass
+    task = _read(task_file)
+    if task is not None and task.get("status") in ["completed", "failed"]:
+        task_file.unlink(missing_ok=True)
 
 
 if __name__ == "__main__":
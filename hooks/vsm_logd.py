@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+VSM Logger Daemon
+
+Long-lived appender for the execution log.
+
+Hook clients send pre-serialized JSONL lines as datagrams to
+.claude/vsm-state/log.sock; the daemon queues them on the buffered
+O_APPEND writer so a burst of tool events costs one write() instead of
+one per event. It is started on demand by the first client that finds no
+listener and exits after IDLE_TIMEOUT seconds without traffic.
+"""
+
+import signal
+import socket
+import sys
+
+from _jsonl import enqueue
+from _paths import log_file, socket_file
+
+IDLE_TIMEOUT = 300  # seconds
+MAX_DATAGRAM = 65536
+
+
+def _bind() -> socket.socket:
+    """Bind the daemon socket, clearing a stale one left by a dead daemon."""
+    path = str(socket_file())
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        sock.bind(path)
+        return sock
+    except OSError:
+        pass
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        socket_file().unlink(missing_ok=True)
+        sock.bind(path)
+        return sock
+    finally:
+        probe.close()
+
+    # Another daemon is already listening
+    sock.close()
+    sys.exit(0)
+
+
+def serve() -> None:
+    """Receive lines until the socket has been idle for IDLE_TIMEOUT."""
+    sock = _bind()
+    sock.settimeout(IDLE_TIMEOUT)
+    path = log_file()
+
+    try:
+        while True:
+            try:
+                line = sock.recv(MAX_DATAGRAM)
+            except socket.timeout:
+                break
+            if line:
+                enqueue(path, line if line.endswith(b"\n") else line + b"\n")
+    finally:
+        # Stop accepting before the atexit flush drains the buffer
+        sock.close()
+        socket_file().unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    # Turn SIGTERM into a normal exit so pending lines are flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    serve()
@@ -4,9 +4,19 @@ VSM Orchestrator
 Viable Systems Model multi-agent orchestration for development tasks.
 """
 
-from .state_manager import StateManager, CurrentTask, ViabilityMetrics
-from .execution_log import ExecutionLog, LogEventType
-from .complexity_analyzer import ComplexityAnalyzer, Complexity
+from importlib import import_module
+
+# Exported names and their modules, imported on first access so that
+# `python -m orchestrator` only loads what the chosen command needs
+_EXPORTS = {
+    'StateManager': '.state_manager',
+    'CurrentTask': '.state_manager',
+    'ViabilityMetrics': '.state_manager',
+    'ExecutionLog': '.execution_log',
+    'LogEventType': '.execution_log',
+    'ComplexityAnalyzer': '.complexity_analyzer',
+    'Complexity': '.complexity_analyzer',
+}
 
 __all__ = [
     'StateManager',
@@ -17,3 +27,16 @@ __all__ = [
     'ComplexityAnalyzer',
     'Complexity',
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,61 @@
+"""
+Default Agent Registry
+
+S1 agents registered when a project has no agent-registry.json yet.
+
+Imported only when the registry is first created. The agents table is
+serialized once at import; every fresh registry is decoded from those
+bytes, so callers never share (or mutate) the constant.
+"""
+
+from ._json import encode
+
+DEFAULT_AGENTS = {
+    "generalist-coder": {
+        "type": "generalist",
+        "status": "available",
+        "capabilities": ["general coding", "simple fixes", "small features"]
+    },
+    "code-writer": {
+        "type": "functional",
+        "status": "available",
+        "capabilities": ["implementation", "new features", "code generation"]
+    },
+    "tester": {
+        "type": "functional",
+        "status": "available",
+        "capabilities": ["unit tests", "integration tests", "test coverage"]
+    },
+    "reviewer": {
+        "type": "functional",
+        "status": "available",
+        "capabilities": ["code review", "best practices", "quality checks"]
+    },
+    "documenter": {
+        "type": "functional",
+        "status": "available",
+        "capabilities": ["documentation", "comments", "API docs"]
+    },
+    "frontend": {
+        "type": "domain",
+        "status": "available",
+        "capabilities": ["UI/UX", "React", "CSS", "accessibility"]
+    },
+    "backend": {
+        "type": "domain",
+        "status": "available",
+        "capabilities": ["APIs", "services", "business logic"]
+    },
+    "database": {
+        "type": "domain",
+        "status": "available",
+        "capabilities": ["SQL", "migrations", "data modeling", "queries"]
+    },
+    "infrastructure": {
+        "type": "domain",
+        "status": "available",
+        "capabilities": ["DevOps", "CI/CD", "deployment", "containers"]
+    }
+}
+
+DEFAULT_AGENTS_JSON = encode(DEFAULT_AGENTS)
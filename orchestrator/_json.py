@@ -0,0 +1,46 @@
+"""
+JSON Encoding for VSM Orchestrator
+
+Shared encode/decode helpers for the log and state files. Uses orjson when
+it is installed and falls back to the standard library otherwise.
+
+Values JSON cannot represent natively are written as str(value), matching
+the default=str the state files have always been written with.
+"""
+
+from dataclasses import asdict, is_dataclass
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+    import json
+
+
+def _default(obj: Any) -> Any:
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    return str(obj)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _INDENTED = _OPTIONS | orjson.OPT_INDENT_2
+
+    def encode(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to UTF-8 JSON bytes, optionally with two-space indentation."""
+        return orjson.dumps(obj, default=str, option=_INDENTED if indent else _OPTIONS)
+
+    loads = orjson.loads
+else:
+    def encode(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to UTF-8 JSON bytes, optionally with two-space indentation."""
+        return json.dumps(obj, default=_default, indent=2 if indent else None).encode()
+
+    loads = json.loads
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to a JSON string."""
+    return encode(obj, indent).decode()
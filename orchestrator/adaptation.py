@@ -4,13 +4,11 @@ Adaptation Engine for VSM Orchestrator
 Implements automatic adaptation based on viability metrics.
 """
 
-from dataclasses import dataclass, field
-from datetime import datetime
+from dataclasses import dataclass, replace
 from enum import Enum
 from typing import List, Optional
-import json
 
-from .state_manager import StateManager, ViabilityMetrics
+from .state_manager import StateManager, ViabilityMetrics, now_iso
 
 
 class AdaptationType(str, Enum):
@@ -23,14 +21,14 @@ class AdaptationType(str, Enum):
     TIGHTEN_S3_STAR = "tighten_s3_star"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Adaptation:
     """An adaptation to apply to the system."""
     type: AdaptationType
     trigger: str
     effect: str
     applied_at: str = ""
-    parameters: dict = field(default_factory=dict)
+    parameters: tuple[tuple[str, str], ...] = ()  # (key, value) pairs
 
     def to_dict(self) -> dict:
         return {
@@ -38,7 +36,7 @@ class Adaptation:
             "trigger": self.trigger,
             "effect": self.effect,
             "applied_at": self.applied_at,
-            "parameters": self.parameters
+            "parameters": dict(self.parameters)
         }
 
 
@@ -59,6 +57,8 @@ class AdaptationEngine:
 
     def __init__(self, state_manager: StateManager):
         self.state = state_manager
+        self._index: Optional[dict] = None
+        self._index_version = -1
 
     def analyze_metrics(self, metrics: ViabilityMetrics) -> List[Adaptation]:
         """
@@ -79,7 +79,7 @@ class AdaptationEngine:
                     type=AdaptationType.ADD_REVIEW_STEP,
                     trigger=f"{agent_name}_errors",
                     effect=f"Add reviewer before {agent_name}",
-                    parameters={"target_agent": agent_name}
+                    parameters=(("target_agent", agent_name),)
                 ))
 
         # Check completion rate (indicator of complexity threshold issues)
@@ -124,36 +124,59 @@ class AdaptationEngine:
 
         return adaptations
 
-    def apply_adaptations(self, adaptations: List[Adaptation]) -> None:
+    def apply_adaptations(self, adaptations: List[Adaptation],
+                          applied_at: Optional[str] = None) -> List[dict]:
         """
         Apply adaptations and record them in metrics.
 
         Args:
             adaptations: List of adaptations to apply
+            applied_at: Timestamp to record for them (defaults to now)
+
+        Returns:
+            The adaptations as dicts, in order. Newly applied ones are the
+            records stored in metrics, stamped with applied_at.
         """
         if not adaptations:
-            return
+            return []
+        applied_at = applied_at or now_iso()
 
         metrics = self.state.get_viability_metrics()
+        active = metrics.active_adaptations
 
+        records = []
         for adaptation in adaptations:
             # Check if this adaptation is already active
-            active_types = [a.get("type") for a in metrics.active_adaptations]
-            if adaptation.type.value in active_types:
+            if adaptation.type.value in active:
+                records.append(adaptation.to_dict())
                 continue
 
             # Apply the adaptation
-            adaptation.applied_at = datetime.utcnow().isoformat()
+            record = replace(adaptation, applied_at=applied_at).to_dict()
 
             # Record in metrics
-            metrics.active_adaptations.append(adaptation.to_dict())
+            active[adaptation.type.value] = record
+            records.append(record)
 
         self.state.update_viability_metrics(metrics)
+        return records
 
     def get_active_adaptations(self) -> List[dict]:
         """Get currently active adaptations."""
         metrics = self.state.get_viability_metrics()
-        return metrics.active_adaptations
+        return list(metrics.active_adaptations.values())
+
+    def _active_index(self) -> dict:
+        """
+        Map each active adaptation type to its adaptation.
+
+        Read once and reused until the state manager next writes metrics.
+        """
+        version = self.state.metrics_version
+        if self._index is None or self._index_version != version:
+            self._index = self.state.get_viability_metrics().active_adaptations
+            self._index_version = version
+        return self._index
 
     def clear_adaptation(self, adaptation_type: AdaptationType) -> None:
         """
@@ -163,40 +186,26 @@ class AdaptationEngine:
             adaptation_type: Type of adaptation to clear
         """
         metrics = self.state.get_viability_metrics()
-        metrics.active_adaptations = [
-            a for a in metrics.active_adaptations
-            if a.get("type") != adaptation_type.value
-        ]
+        metrics.active_adaptations.pop(adaptation_type.value, None)
         self.state.update_viability_metrics(metrics)
 
     def should_add_review_step(self, before_agent: str) -> bool:
         """Check if a review step should be added before an agent."""
-        for adaptation in self.get_active_adaptations():
-            if (adaptation.get("type") == AdaptationType.ADD_REVIEW_STEP.value and
-                adaptation.get("parameters", {}).get("target_agent") == before_agent):
-                return True
-        return False
+        adaptation = self._active_index().get(AdaptationType.ADD_REVIEW_STEP.value)
+        return (adaptation is not None and
+                adaptation.get("parameters", {}).get("target_agent") == before_agent)
 
     def should_require_s5_approval(self) -> bool:
         """Check if S5 approval is required for S3 decisions."""
-        for adaptation in self.get_active_adaptations():
-            if adaptation.get("type") == AdaptationType.REQUIRE_S5_APPROVAL.value:
-                return True
-        return False
+        return AdaptationType.REQUIRE_S5_APPROVAL.value in self._active_index()
 
     def should_increase_s2(self) -> bool:
         """Check if S2 involvement should be increased."""
-        for adaptation in self.get_active_adaptations():
-            if adaptation.get("type") == AdaptationType.INCREASE_S2_INVOLVEMENT.value:
-                return True
-        return False
+        return AdaptationType.INCREASE_S2_INVOLVEMENT.value in self._active_index()
 
     def should_parallelize(self) -> bool:
         """Check if S1 agents should be parallelized."""
-        for adaptation in self.get_active_adaptations():
-            if adaptation.get("type") == AdaptationType.PARALLELIZE_S1.value:
-                return True
-        return False
+        return AdaptationType.PARALLELIZE_S1.value in self._active_index()
 
     def get_complexity_adjustment(self) -> float:
         """
@@ -204,7 +213,6 @@ class AdaptationEngine:
 
         Returns negative value to lower thresholds (use specialists earlier).
         """
-        for adaptation in self.get_active_adaptations():
-            if adaptation.get("type") == AdaptationType.LOWER_COMPLEXITY_THRESHOLD.value:
-                return -0.15  # Lower threshold by 15%
+        if AdaptationType.LOWER_COMPLEXITY_THRESHOLD.value in self._active_index():
+            return -0.15  # Lower threshold by 15%
         return 0.0
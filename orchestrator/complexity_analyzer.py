@@ -5,8 +5,9 @@ Assesses task complexity to help S3 determine appropriate agent allocation.
 Uses heuristics based on task keywords, scope, and domain indicators.
 """
 
+import functools
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
@@ -25,17 +26,17 @@ class AgentType(str, Enum):
     DOMAIN = "domain"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ComplexityAssessment:
-    """Result of complexity analysis."""
+    """Result of complexity analysis (immutable, shared between cache hits)."""
     complexity: Complexity
     confidence: float  # 0.0 to 1.0
     rationale: str
-    suggested_agents: list
-    suggested_agent_types: list
+    suggested_agents: tuple
+    suggested_agent_types: tuple
     parallel_possible: bool = False
-    keywords_found: list = field(default_factory=list)
-    domain_signals: list = field(default_factory=list)
+    keywords_found: tuple = ()
+    domain_signals: tuple = ()
     scope_estimate: str = ""
 
 
@@ -60,6 +61,13 @@ COMPLEXITY_KEYWORDS = {
     ]
 }
 
+# Mentions that pull a specific functional agent into a medium task.
+# Matched in the same sweep as COMPLEXITY_KEYWORDS but not scored.
+AGENT_SIGNALS = {
+    "tester": [r"\btest\b"],
+    "reviewer": [r"\breview\b", r"\bquality\b"]
+}
+
 # Domain detection patterns
 DOMAIN_PATTERNS = {
     "frontend": [
@@ -102,6 +110,94 @@ SCOPE_PATTERNS = {
     ]
 }
 
+# Single-pass matchers, built from the tables above by compile_patterns().
+# Task text is lowercased before matching, so no re.IGNORECASE is needed.
+_COMPLEXITY_INDEX: tuple = ()
+_SIGNAL_INDEX: tuple = ()
+_DOMAIN_INDEX: tuple = ()
+_SCOPE_INDEX: tuple = ()
+
+_WORD_RE = re.compile(r"\b\w+")
+# A pattern that opens with "\bword" followed by a word break can only match
+# where that exact word starts. Alternations and optional separators could
+# match elsewhere, so those patterns are searched on their own.
+_LEADING_WORD_RE = re.compile(r"\\b(\w+)(?=\\b|\\s(?![*?{])|-(?![*?{])|$)")
+# Substrings that must occur in the text for a costly pattern to match.
+# The file-path pattern backtracks through its character class after
+# every "in", but can only succeed when the text contains a dot.
+_PREFILTERS = {
+    r"\bin\s+[\w./]+\.\w+\b": ".",
+}
+
+
+def _index(table: dict) -> tuple:
+    """
+    Index a pattern table for single-pass matching.
+
+    Returns (tags, by_word, rest): tags lists (bucket, pattern) in table
+    order, by_word maps a leading word to the (tag, regex, prefilter)
+    entries that start with it, and rest holds entries that have to be
+    searched in full.
+    """
+    tags = []
+    by_word = {}
+    rest = []
+    for bucket, patterns in table.items():
+        for pattern in patterns:
+            tag = len(tags)
+            tags.append((bucket, pattern))
+            entry = (tag, re.compile(pattern), _PREFILTERS.get(pattern))
+            lead = None if "|" in pattern else _LEADING_WORD_RE.match(pattern)
+            if lead:
+                by_word.setdefault(lead.group(1), []).append(entry)
+            else:
+                rest.append(entry)
+    return tags, by_word, rest
+
+
+def _sweep(index: tuple, text: str) -> dict:
+    """
+    Match an indexed table against text in one walk over its words.
+
+    Returns the first matched text for each pattern found, keyed by tag.
+    """
+    _, by_word, rest = index
+    found = {}
+    for word in _WORD_RE.finditer(text):
+        candidates = by_word.get(word.group())
+        if candidates:
+            pos = word.start()
+            for tag, regex, prefilter in candidates:
+                if tag not in found and (prefilter is None or prefilter in text):
+                    match = regex.match(text, pos)
+                    if match:
+                        found[tag] = match.group()
+    for tag, regex, prefilter in rest:
+        if prefilter is not None and prefilter not in text:
+            continue
+        match = regex.search(text)
+        if match:
+            found[tag] = match.group()
+    return found
+
+
+def compile_patterns() -> None:
+    """
+    Compile the keyword, signal, domain and scope tables.
+
+    Runs at import time. Call it again after modifying COMPLEXITY_KEYWORDS,
+    AGENT_SIGNALS, DOMAIN_PATTERNS or SCOPE_PATTERNS so the analyzer picks
+    up the changes; this also clears cached analyze() results.
+    """
+    global _COMPLEXITY_INDEX, _SIGNAL_INDEX, _DOMAIN_INDEX, _SCOPE_INDEX
+
+    _COMPLEXITY_INDEX = _index({**COMPLEXITY_KEYWORDS, **AGENT_SIGNALS})
+    _SIGNAL_INDEX = _index(AGENT_SIGNALS)
+    _DOMAIN_INDEX = _index(DOMAIN_PATTERNS)
+    _SCOPE_INDEX = _index(SCOPE_PATTERNS)
+
+    ComplexityAnalyzer.analyze.cache_clear()
+
 
 class ComplexityAnalyzer:
     """Analyzes task complexity for agent allocation."""
@@ -151,55 +247,58 @@ class ComplexityAnalyzer:
             user_hint: Optional explicit complexity hint from user
 
         Returns:
-            ComplexityAssessment with complexity level and recommendations
+            ComplexityAssessment with complexity level and recommendations.
+            Results are cached per (task, hint, threshold adjustment), so
+            repeated calls return the same immutable instance.
         """
+        return self._analyze_cached(
+            task_description, user_hint, self.threshold_adjustment
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _analyze_cached(task_description: str, user_hint: Optional[str],
+                        threshold_adjustment: float) -> ComplexityAssessment:
+        """Uncached body of analyze()."""
         task_lower = task_description.lower()
 
-        # Check for explicit user hint first
+        # Check for explicit user hint first; no keyword scoring needed
         if user_hint:
             hint_lower = user_hint.lower()
             if "simple" in hint_lower:
-                return self._create_assessment(
-                    Complexity.SIMPLE, 0.95, "User specified simple",
-                    task_lower, override=True
+                return ComplexityAnalyzer._create_assessment_fast(
+                    Complexity.SIMPLE, 0.95, "User specified simple"
                 )
             elif "complex" in hint_lower:
-                return self._create_assessment(
-                    Complexity.COMPLEX, 0.95, "User specified complex",
-                    task_lower, override=True
+                return ComplexityAnalyzer._create_assessment_fast(
+                    Complexity.COMPLEX, 0.95, "User specified complex"
                 )
             elif "medium" in hint_lower:
-                return self._create_assessment(
+                # Medium picks its helpers from the task text
+                signals = _sweep(_SIGNAL_INDEX, task_lower)
+                return ComplexityAnalyzer._create_assessment_fast(
                     Complexity.MEDIUM, 0.95, "User specified medium",
-                    task_lower, override=True
+                    {_SIGNAL_INDEX[0][tag][0] for tag in signals}
                 )
 
+        keywords = _sweep(_COMPLEXITY_INDEX, task_lower)
+
         # Calculate scores for each complexity level
-        scores = {
-            Complexity.SIMPLE: self._calculate_keyword_score(
-                task_lower, COMPLEXITY_KEYWORDS[Complexity.SIMPLE]
-            ),
-            Complexity.MEDIUM: self._calculate_keyword_score(
-                task_lower, COMPLEXITY_KEYWORDS[Complexity.MEDIUM]
-            ),
-            Complexity.COMPLEX: self._calculate_keyword_score(
-                task_lower, COMPLEXITY_KEYWORDS[Complexity.COMPLEX]
-            )
-        }
+        scores = ComplexityAnalyzer._calculate_keyword_scores(keywords)
 
         # Apply threshold adjustment
-        scores[Complexity.COMPLEX] += self.threshold_adjustment
-        scores[Complexity.MEDIUM] += self.threshold_adjustment * 0.5
+        scores[Complexity.COMPLEX] += threshold_adjustment
+        scores[Complexity.MEDIUM] += threshold_adjustment * 0.5
 
         # Detect domains
-        domains = self._detect_domains(task_lower)
+        domains = ComplexityAnalyzer._detect_domains(task_lower)
 
         # Adjust for multi-domain (increases complexity)
         if len(domains) > 1:
             scores[Complexity.COMPLEX] += 0.3
 
         # Detect scope
-        scope = self._detect_scope(task_lower)
+        scope = ComplexityAnalyzer._detect_scope(task_lower)
         if scope == "cross_module":
             scores[Complexity.COMPLEX] += 0.2
         elif scope == "multi_file":
@@ -219,41 +318,47 @@ class ComplexityAnalyzer:
         confidence = min(0.95, 0.5 + (max_score - second_score))
 
         # Build rationale
-        rationale = self._build_rationale(scores, domains, scope)
+        rationale = ComplexityAnalyzer._build_rationale(scores, domains, scope)
 
-        return self._create_assessment(
-            complexity, confidence, rationale, task_lower,
+        return ComplexityAnalyzer._create_assessment(
+            complexity, confidence, rationale, keywords,
             domains=domains, scope=scope
         )
 
-    def _calculate_keyword_score(self, text: str, patterns: list) -> float:
-        """Calculate score based on keyword matches."""
-        score = 0.0
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                score += 0.25
-        return min(score, 1.0)
-
-    def _detect_domains(self, text: str) -> list:
+    analyze.cache_clear = _analyze_cached.__func__.cache_clear
+
+    @staticmethod
+    def _calculate_keyword_scores(keywords: dict) -> dict:
+        """Calculate a score per complexity level from matched keywords."""
+        tags = _COMPLEXITY_INDEX[0]
+        counts = {Complexity.SIMPLE: 0, Complexity.MEDIUM: 0, Complexity.COMPLEX: 0}
+        for tag in keywords:
+            level = tags[tag][0]
+            if level in counts:  # agent signals carry no score
+                counts[level] += 1
+        return {level: min(0.25 * count, 1.0) for level, count in counts.items()}
+
+    @staticmethod
+    def _detect_domains(text: str) -> list:
         """Detect which domains are relevant to the task."""
+        tags = _DOMAIN_INDEX[0]
         domains = []
-        for domain, patterns in DOMAIN_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    if domain not in domains:
-                        domains.append(domain)
-                    break
+        for tag in sorted(_sweep(_DOMAIN_INDEX, text)):
+            domain = tags[tag][0]
+            if domain not in domains:
+                domains.append(domain)
         return domains
 
-    def _detect_scope(self, text: str) -> str:
+    @staticmethod
+    def _detect_scope(text: str) -> str:
         """Detect the scope of changes."""
-        for scope, patterns in SCOPE_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    return scope
+        found = _sweep(_SCOPE_INDEX, text)
+        if found:
+            return _SCOPE_INDEX[0][min(found)][0]
         return "unknown"
 
-    def _build_rationale(self, scores: dict, domains: list, scope: str) -> str:
+    @staticmethod
+    def _build_rationale(scores: dict, domains: list, scope: str) -> str:
         """Build explanation for the complexity assessment."""
         parts = []
 
@@ -275,77 +380,102 @@ class ComplexityAnalyzer:
 
         return "; ".join(parts) if parts else "No strong signals detected"
 
-    def _create_assessment(self, complexity: Complexity, confidence: float,
-                          rationale: str, task_text: str,
-                          domains: Optional[list] = None,
-                          scope: str = "unknown",
-                          override: bool = False) -> ComplexityAssessment:
-        """Create the final assessment with agent recommendations."""
-        domains = domains or []
-
-        # Determine suggested agents based on complexity and domains
-        suggested_agents = []
-        suggested_types = []
-
+    @staticmethod
+    def _suggest_agents(complexity: Complexity, signals: set,
+                        domains: list) -> tuple:
+        """Pick agents for a complexity level; returns (agents, types, parallel)."""
         if complexity == Complexity.SIMPLE:
-            suggested_agents = ["generalist-coder"]
-            suggested_types = [AgentType.GENERALIST]
-            parallel = False
+            return ["generalist-coder"], [AgentType.GENERALIST], False
 
-        elif complexity == Complexity.MEDIUM:
+        if complexity == Complexity.MEDIUM:
             # Use functional specialists
             suggested_agents = ["code-writer"]
             suggested_types = [AgentType.FUNCTIONAL]
 
             # Add tester if testing is mentioned
-            if re.search(r"\btest\b", task_text):
+            if "tester" in signals:
                 suggested_agents.append("tester")
 
             # Add reviewer for quality-sensitive tasks
-            if re.search(r"\breview\b|\bquality\b", task_text):
+            if "reviewer" in signals:
                 suggested_agents.append("reviewer")
 
             parallel = len(suggested_agents) == 1  # Only parallel if single agent
+            return suggested_agents, suggested_types, parallel
 
-        else:  # COMPLEX
-            # Use domain specialists
-            if domains:
-                suggested_agents = [d for d in domains]
-                suggested_types = [AgentType.DOMAIN] * len(domains)
-            else:
-                # Default to functional specialists for unclassified complex tasks
-                suggested_agents = ["code-writer", "reviewer"]
-                suggested_types = [AgentType.FUNCTIONAL, AgentType.FUNCTIONAL]
+        # COMPLEX: use domain specialists
+        if domains:
+            suggested_agents = [d for d in domains]
+            suggested_types = [AgentType.DOMAIN] * len(domains)
+        else:
+            # Default to functional specialists for unclassified complex tasks
+            suggested_agents = ["code-writer", "reviewer"]
+            suggested_types = [AgentType.FUNCTIONAL, AgentType.FUNCTIONAL]
+
+        # Always add tester and reviewer for complex tasks
+        if "tester" not in suggested_agents:
+            suggested_agents.append("tester")
+            suggested_types.append(AgentType.FUNCTIONAL)
+        if "reviewer" not in suggested_agents:
+            suggested_agents.append("reviewer")
+            suggested_types.append(AgentType.FUNCTIONAL)
+
+        # Complex tasks can often parallelize domain work
+        parallel = len(domains) > 1
+        return suggested_agents, suggested_types, parallel
+
+    @staticmethod
+    def _create_assessment_fast(complexity: Complexity, confidence: float,
+                                rationale: str,
+                                signals: frozenset = frozenset()) -> ComplexityAssessment:
+        """
+        Create an assessment for a user-specified complexity.
 
-            # Always add tester and reviewer for complex tasks
-            if "tester" not in suggested_agents:
-                suggested_agents.append("tester")
-                suggested_types.append(AgentType.FUNCTIONAL)
-            if "reviewer" not in suggested_agents:
-                suggested_agents.append("reviewer")
-                suggested_types.append(AgentType.FUNCTIONAL)
+        Skips keyword extraction, so keywords_found is left empty.
+        """
+        agents, types, parallel = ComplexityAnalyzer._suggest_agents(
+            complexity, signals, []
+        )
+        return ComplexityAssessment(
+            complexity=complexity,
+            confidence=confidence,
+            rationale=rationale,
+            suggested_agents=tuple(agents),
+            suggested_agent_types=tuple(types),
+            parallel_possible=parallel,
+            scope_estimate="unknown"
+        )
+
+    @staticmethod
+    def _create_assessment(complexity: Complexity, confidence: float,
+                           rationale: str, keywords: dict,
+                           domains: Optional[list] = None,
+                           scope: str = "unknown") -> ComplexityAssessment:
+        """Create the final assessment with agent recommendations."""
+        domains = domains or []
+        tags = _COMPLEXITY_INDEX[0]
+        signals = {tags[tag][0] for tag in keywords}
 
-            # Complex tasks can often parallelize domain work
-            parallel = len(domains) > 1
+        # Determine suggested agents based on complexity and domains
+        agents, types, parallel = ComplexityAnalyzer._suggest_agents(
+            complexity, signals, domains
+        )
 
-        # Find keywords that matched
-        keywords_found = []
-        for pattern in (COMPLEXITY_KEYWORDS[Complexity.SIMPLE] +
-                       COMPLEXITY_KEYWORDS[Complexity.MEDIUM] +
-                       COMPLEXITY_KEYWORDS[Complexity.COMPLEX]):
-            match = re.search(pattern, task_text, re.IGNORECASE)
-            if match:
-                keywords_found.append(match.group())
+        # Keywords that matched, in table order
+        keywords_found = [
+            keywords[tag] for tag in sorted(keywords)
+            if isinstance(tags[tag][0], Complexity)
+        ]
 
         return ComplexityAssessment(
             complexity=complexity,
             confidence=confidence,
             rationale=rationale,
-            suggested_agents=suggested_agents,
-            suggested_agent_types=suggested_types,
+            suggested_agents=tuple(agents),
+            suggested_agent_types=tuple(types),
             parallel_possible=parallel,
-            keywords_found=keywords_found,
-            domain_signals=domains,
+            keywords_found=tuple(keywords_found),
+            domain_signals=tuple(domains),
             scope_estimate=scope
         )
 
@@ -358,11 +488,14 @@ class ComplexityAnalyzer:
         return {
             "complexity": assessment.complexity.value,
             "confidence": assessment.confidence,
-            "primary_agents": assessment.suggested_agents[:2],
-            "support_agents": assessment.suggested_agents[2:],
+            "primary_agents": list(assessment.suggested_agents[:2]),
+            "support_agents": list(assessment.suggested_agents[2:]),
             "agent_types": [t.value for t in assessment.suggested_agent_types],
             "parallel_execution": assessment.parallel_possible,
             "rationale": assessment.rationale,
-            "domains": assessment.domain_signals,
+            "domains": list(assessment.domain_signals),
             "scope": assessment.scope_estimate
         }
+
+
+compile_patterns()
@@ -4,14 +4,22 @@ Execution Log for VSM Orchestrator
 Append-only JSONL log for audit trail of all VSM operations.
 """
 
-import json
+import atexit
+import fcntl
+import mmap
 import os
-from datetime import datetime
+import re
+import secrets
+import sys
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional, Iterator
-from dataclasses import dataclass, asdict
+from typing import Optional, Iterator
+from dataclasses import dataclass
 from enum import Enum
 
+from ._json import dumps, encode, loads
+
 
 class LogEventType(str, Enum):
     """Types of log events."""
@@ -30,15 +38,41 @@ class LogEventType(str, Enum):
     OSCILLATION_DETECTED = "oscillation_detected"
 
 
-@dataclass
+# Event type strings as stored in the log, bound once for comparisons
+_EV_STARTED = LogEventType.TASK_STARTED.value
+_EV_COMPLETED = LogEventType.TASK_COMPLETED.value
+_EV_FAILED = LogEventType.TASK_FAILED.value
+_EV_AGENT_INVOKED = LogEventType.AGENT_INVOKED.value
+_EV_AGENT_COMPLETED = LogEventType.AGENT_COMPLETED.value
+_EV_AGENT_ERROR = LogEventType.AGENT_ERROR.value
+_EV_AUDIT = LogEventType.AUDIT_PERFORMED.value
+_EV_CONFLICT = LogEventType.CONFLICT_DETECTED.value
+_EV_ADAPTATION = LogEventType.ADAPTATION_APPLIED.value
+
+
+def format_timestamp(timestamp: int | str) -> str:
+    """
+    Render a log timestamp as ISO 8601.
+
+    Orchestrator entries store nanoseconds since the epoch; entries written
+    by the hook scripts already carry an ISO string and pass through.
+    """
+    if isinstance(timestamp, str):
+        return timestamp
+    seconds, nanos = divmod(timestamp, 1_000_000_000)
+    moment = datetime.fromtimestamp(seconds, tz=timezone.utc)
+    return moment.replace(microsecond=nanos // 1000).isoformat()
+
+
+@dataclass(slots=True)
 class LogEntry:
     """A single log entry."""
-    timestamp: str
+    timestamp: int | str  # ns since the epoch (ISO string from hooks)
     event_type: str
     task_id: Optional[str]
+    session_id: str
     agent: Optional[str]
     data: dict
-    session_id: str
 
     @classmethod
     def create(cls, event_type: LogEventType, task_id: Optional[str] = None,
@@ -46,45 +80,286 @@ class LogEntry:
                session_id: str = "") -> "LogEntry":
         """Create a new log entry with current timestamp."""
         return cls(
-            timestamp=datetime.utcnow().isoformat(),
-            event_type=event_type.value,
+            timestamp=time.time_ns(),
+            event_type=sys.intern(event_type.value),
             task_id=task_id,
             agent=agent,
             data=data or {},
             session_id=session_id
         )
 
+    def to_dict(self) -> dict:
+        """Convert to a plain dict (data is shared, not copied)."""
+        return {
+            "timestamp": self.timestamp,
+            "event_type": self.event_type,
+            "task_id": self.task_id,
+            "session_id": self.session_id,
+            "agent": self.agent,
+            "data": self.data
+        }
+
     def to_json(self) -> str:
         """Convert to JSON string."""
-        return json.dumps(asdict(self), default=str)
+        return dumps(self.to_dict())
 
     @classmethod
     def from_json(cls, json_str: str) -> "LogEntry":
-        """Create from JSON string."""
-        data = json.loads(json_str)
-        return cls(**data)
+        """
+        Create from JSON string.
+
+        The hook scripts write flat records into the same log; any keys
+        beyond the LogEntry fields end up in data. Raises ValueError for a
+        line that is not a JSON object.
+        """
+        record = loads(json_str)
+        if not isinstance(record, dict):
+            raise ValueError("log entry is not a JSON object")
+        data = record.pop("data", None) or {}
+        if not isinstance(data, dict):
+            data = {"data": data}
+        entry = cls(
+            timestamp=record.pop("timestamp", ""),
+            event_type=sys.intern(str(record.pop("event_type", None) or "")),
+            task_id=record.pop("task_id", None),
+            agent=record.pop("agent", None),
+            data=data,
+            session_id=record.pop("session_id", None) or ""
+        )
+        data.update(record)
+        return entry
+
+
+# Top-level id fields, read from raw lines without decoding them. Entries
+# write both ids ahead of their data payload, so the first occurrence of
+# the key is the top-level one.
+_TASK_ID_RE = re.compile(rb'"task_id":\s*(?:null|"((?:[^"\\]|\\.)*)")')
+_SESSION_ID_RE = re.compile(rb'"session_id":\s*(?:null|"((?:[^"\\]|\\.)*)")')
+# Every writer puts event_type ahead of any payload, too
+_EVENT_TYPE_RE = re.compile(rb'"event_type":\s*"([a-z_]*)"')
+
+
+def _raw_field(regex: re.Pattern, line: bytes) -> Optional[str]:
+    """
+    Extract a string id from a raw log line, or None if absent or null.
+
+    Raises ValueError if the id's escapes cannot be decoded.
+    """
+    match = regex.search(line)
+    if match is None or match.group(1) is None:
+        return None
+    value = match.group(1)
+    if b"\\" in value:
+        return loads(b'"' + value + b'"')  # has escapes; let the decoder handle them
+    return value.decode()
+
+
+# Block size for scanning the log backwards from its end
+_TAIL_BLOCK = 1 << 16
+
+# Bytes of entries held in memory before they are written out
+_WRITE_BUFFER = 1 << 16
+
+# Events flushed to disk as soon as they are logged. Agent boundaries are
+# among them, so everything logged before an agent runs is on disk ahead of
+# the lines its hooks append, and a crash loses at most one step's entries.
+_DURABLE_EVENTS = frozenset({
+    _EV_COMPLETED,
+    _EV_FAILED,
+    _EV_AGENT_INVOKED,
+    _EV_AGENT_COMPLETED,
+    _EV_AGENT_ERROR,
+})
+
+
+def _reversed_lines(f) -> Iterator[bytes]:
+    """
+    Yield the complete lines of a binary file from last to first.
+
+    Reads backwards in _TAIL_BLOCK chunks. Bytes after the final newline
+    belong to a line still being written and are skipped.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    buffer = b""
+    partial = True
+    while pos > 0:
+        step = min(_TAIL_BLOCK, pos)
+        pos -= step
+        f.seek(pos)
+        lines = (f.read(step) + buffer).split(b"\n")
+        buffer = lines[0]  # may continue in the preceding block
+        for line in reversed(lines[1:]):
+            if partial:
+                partial = False
+            elif line:
+                yield line
+    if buffer and not partial:
+        yield buffer
+
+
+def _byte_at(path: Path, offset: int) -> bytes:
+    """Read the single byte at offset (empty past the end of the file)."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.pread(fd, 1, offset)
+    finally:
+        os.close(fd)
+
+
+def _open_append(path: Path) -> int:
+    return os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+
+def _mapped_lines(path: Path) -> Iterator[bytes]:
+    """Yield the non-empty lines of a file, read through a memory map."""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return  # empty files cannot be mapped
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while pos < size:
+                end = mm.find(b"\n", pos)
+                if end < 0:
+                    end = size
+                if end > pos:
+                    yield mm[pos:end]
+                pos = end + 1
+
+
+# Task summary updates, keyed by event type
+def _summarize_started(summary: dict, entry: LogEntry) -> None:
+    summary["started_at"] = format_timestamp(entry.timestamp)
+    summary["status"] = "in_progress"
+
+
+def _summarize_completed(summary: dict, entry: LogEntry) -> None:
+    summary["completed_at"] = format_timestamp(entry.timestamp)
+    summary["status"] = "completed" if entry.data.get("success") else "failed"
+
+
+def _summarize_agent(summary: dict, entry: LogEntry) -> None:
+    summary["agents_invoked"].append(entry.agent)
+
+
+def _summarize_audit(summary: dict, entry: LogEntry) -> None:
+    summary["audit_passed"] = entry.data.get("passed")
+
+
+def _summarize_conflict(summary: dict, entry: LogEntry) -> None:
+    summary["conflicts"].append(entry.data)
+
+
+def _summarize_adaptation(summary: dict, entry: LogEntry) -> None:
+    summary["adaptations"].append(entry.data)
+
+
+_SUMMARY_HANDLERS = {
+    _EV_STARTED: _summarize_started,
+    _EV_COMPLETED: _summarize_completed,
+    _EV_AGENT_INVOKED: _summarize_agent,
+    _EV_AUDIT: _summarize_audit,
+    _EV_CONFLICT: _summarize_conflict,
+    _EV_ADAPTATION: _summarize_adaptation,
+}
+_SUMMARY_EVENTS = frozenset(event.encode() for event in _SUMMARY_HANDLERS)
 
 
 class ExecutionLog:
-    """Append-only execution log for VSM operations."""
+    """
+    Append-only execution log for VSM operations.
+
+    Entries are buffered in memory and written to a descriptor that stays
+    open for the life of the log. The buffer is flushed once it holds
+    _WRITE_BUFFER bytes, before every read, when an agent is invoked or
+    completes, on task completion or agent errors, and when the log is
+    closed (at the latest, at exit).
+
+    The hooks roll the same file over once it grows too large. Each flush
+    takes the lock they roll under and reopens the live file if the
+    descriptor was left pointing at a rolled segment.
+    """
 
     def __init__(self, state_dir: Optional[Path] = None, session_id: Optional[str] = None):
         from .state_manager import get_state_dir
         self.state_dir = state_dir or get_state_dir()
         self.log_file = self.state_dir / "execution-log.jsonl"
+        self.index_file = self.state_dir / "execution-log.idx"
         self.session_id = session_id or self._generate_session_id()
+        self._fd: Optional[int] = None
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+
+        # Byte span of every indexed line, plus lookups from task and session
+        # ids to positions in that list. Hooks append to the same file, so
+        # the index is caught up from the last scanned byte on every query.
+        # It is saved alongside the log at exit and reloaded by the next
+        # process, which then only scans what was appended in between.
+        self._offsets: list[tuple[int, int]] = []
+        self._task_index: dict[str, list[int]] = {}
+        self._session_index: dict[str, list[int]] = {}
+        self._scanned = 0
+        self._index_inode: Optional[int] = None
+        self._index_loaded = False
+        self._index_unsaved = False
 
     def _generate_session_id(self) -> str:
         """Generate a unique session ID."""
-        import hashlib
-        timestamp = datetime.utcnow().isoformat()
-        return hashlib.sha256(timestamp.encode()).hexdigest()[:12]
+        return secrets.token_hex(6)
 
     def append(self, entry: LogEntry) -> None:
         """Append an entry to the log."""
         entry.session_id = self.session_id
-        with open(self.log_file, 'a') as f:
-            f.write(entry.to_json() + "\n")
+        payload = encode(entry.to_dict())
+        # Two buffered pieces rather than a concatenated copy
+        self._buffer.append(payload)
+        self._buffer.append(b"\n")
+        self._buffered += len(payload) + 1
+        if self._buffered >= _WRITE_BUFFER or entry.event_type in _DURABLE_EVENTS:
+            self.flush()
+
+    def _locked_fd(self) -> int:
+        """Get the live log's descriptor with the roll lock held on it."""
+        if self._fd is None:
+            self._fd = _open_append(self.log_file)
+            atexit.register(self.close)
+        while True:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                current = os.stat(self.log_file).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(self._fd).st_ino:
+                return self._fd
+            # Rolled or removed since it was opened
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = _open_append(self.log_file)
+
+    def flush(self) -> None:
+        """Write buffered entries to disk."""
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        fd = self._locked_fd()
+        try:
+            os.write(fd, data)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """Flush and close the log descriptor; the next flush reopens it."""
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            atexit.unregister(self.close)
 
     def log(self, event_type: LogEventType, task_id: Optional[str] = None,
             agent: Optional[str] = None, **data) -> None:
@@ -153,37 +428,174 @@ class ExecutionLog:
         """Log detected oscillation."""
         self.log(LogEventType.OSCILLATION_DETECTED, task_id=task_id, details=details)
 
+    # Index maintenance
+    def _reset_index(self, inode: Optional[int] = None) -> None:
+        self._offsets = []
+        self._task_index = {}
+        self._session_index = {}
+        self._scanned = 0
+        self._index_inode = inode
+
+    def _load_index(self, stat: os.stat_result) -> None:
+        """Adopt the index saved by an earlier process, if it still applies."""
+        self._index_loaded = True
+        try:
+            saved = loads(self.index_file.read_bytes())
+        except (OSError, ValueError):
+            return
+        try:
+            scanned = saved["scanned"]
+            if saved["inode"] != stat.st_ino or scanned > stat.st_size:
+                return  # the log was rolled, replaced or truncated since
+            if scanned and _byte_at(self.log_file, scanned - 1) != b"\n":
+                return  # rewritten in place
+            self._offsets = saved["offsets"]
+            self._task_index = saved["tasks"]
+            self._session_index = saved["sessions"]
+            self._scanned = scanned
+            self._index_inode = stat.st_ino
+        except (KeyError, TypeError):
+            self._reset_index()
+
+    def _save_index(self) -> None:
+        """Write the index next to the log for the next process to reuse."""
+        if not self._index_unsaved:
+            return
+        self._index_unsaved = False
+        atexit.unregister(self._save_index)
+        tmp = self.index_file.with_name(f"{self.index_file.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_bytes(encode({
+                "inode": self._index_inode,
+                "scanned": self._scanned,
+                "offsets": self._offsets,
+                "tasks": self._task_index,
+                "sessions": self._session_index,
+            }))
+            os.replace(tmp, self.index_file)
+        except OSError:
+            pass  # only a cache; the next process rescans
+
+    def _refresh_index(self) -> None:
+        """Index lines appended since the last refresh."""
+        self.flush()
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if not self._index_loaded:
+            self._load_index(stat)
+
+        # A replaced or truncated file has to be indexed from scratch
+        if stat.st_ino != self._index_inode or stat.st_size < self._scanned:
+            self._reset_index(stat.st_ino)
+        if stat.st_size == self._scanned:
+            return
+
+        with open(self.log_file, 'rb') as f:
+            f.seek(self._scanned)
+            chunk = f.read(stat.st_size - self._scanned)
+
+        # Leave a trailing partial line for the next refresh
+        complete = chunk.rfind(b"\n") + 1
+        pos = self._scanned
+        for line in chunk[:complete].split(b"\n")[:-1]:
+            start = pos
+            pos += len(line) + 1
+            if not line:
+                continue
+
+            try:
+                task_id = _raw_field(_TASK_ID_RE, line)
+                session_id = _raw_field(_SESSION_ID_RE, line)
+            except ValueError:
+                continue  # damaged line
+
+            position = len(self._offsets)
+            self._offsets.append((start, pos - 1))
+            if task_id is not None:
+                self._task_index.setdefault(task_id, []).append(position)
+            if session_id is not None:
+                self._session_index.setdefault(session_id, []).append(position)
+        self._scanned = pos
+        if not self._index_unsaved:
+            self._index_unsaved = True
+            atexit.register(self._save_index)
+
+    def _iter_lines(self, positions: list[int]) -> Iterator[bytes]:
+        """Read the raw indexed lines at the given positions, one at a time."""
+        if not positions:
+            return
+        fd = os.open(self.log_file, os.O_RDONLY)
+        try:
+            for position in positions:
+                start, end = self._offsets[position]
+                yield os.pread(fd, end - start, start)
+        finally:
+            os.close(fd)
+
+    def _iter_positions(self, positions: list[int]) -> Iterator[LogEntry]:
+        """Parse the indexed lines at the given positions, one at a time."""
+        for line in self._iter_lines(positions):
+            try:
+                entry = LogEntry.from_json(line)
+            except ValueError:
+                continue  # damaged line
+            yield entry
+
+    def _read_positions(self, positions: list[int]) -> list[LogEntry]:
+        """Parse the indexed lines at the given positions."""
+        return list(self._iter_positions(positions))
+
     # Query methods
     def read_all(self) -> list[LogEntry]:
         """Read all log entries."""
-        if not self.log_file.exists():
-            return []
-        entries = []
-        with open(self.log_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    entries.append(LogEntry.from_json(line))
-        return entries
+        self.flush()
+        return [LogEntry.from_json(line) for line in _mapped_lines(self.log_file)]
 
     def read_session(self, session_id: Optional[str] = None) -> list[LogEntry]:
         """Read log entries for a specific session."""
         target_session = session_id or self.session_id
-        return [e for e in self.read_all() if e.session_id == target_session]
+        self._refresh_index()
+        return self._read_positions(self._session_index.get(target_session, []))
 
     def read_task(self, task_id: str) -> list[LogEntry]:
         """Read log entries for a specific task."""
-        return [e for e in self.read_all() if e.task_id == task_id]
+        self._refresh_index()
+        return self._read_positions(self._task_index.get(task_id, []))
 
     def read_recent(self, count: int = 50) -> list[LogEntry]:
-        """Read the most recent log entries."""
-        entries = self.read_all()
-        return entries[-count:] if len(entries) > count else entries
+        """
+        Read the most recent log entries.
+
+        Scans back from the end of the file, so the cost depends on count
+        rather than on the size of the log.
+        """
+        self.flush()
+        entries = []
+        if count <= 0:
+            return entries
+        try:
+            f = open(self.log_file, 'rb')
+        except FileNotFoundError:
+            return entries
+        with f:
+            for line in _reversed_lines(f):
+                try:
+                    entries.append(LogEntry.from_json(line))
+                except ValueError:
+                    continue
+                if len(entries) == count:
+                    break
+        entries.reverse()
+        return entries
 
     def get_task_summary(self, task_id: str) -> dict:
         """Get a summary of a task's execution."""
-        entries = self.read_task(task_id)
-        if not entries:
+        self._refresh_index()
+        positions = self._task_index.get(task_id)
+        if not positions:
             return {"task_id": task_id, "status": "not_found"}
 
         summary = {
@@ -197,35 +609,32 @@ class ExecutionLog:
             "adaptations": []
         }
 
-        for entry in entries:
-            if entry.event_type == LogEventType.TASK_STARTED.value:
-                summary["started_at"] = entry.timestamp
-                summary["status"] = "in_progress"
-            elif entry.event_type == LogEventType.TASK_COMPLETED.value:
-                summary["completed_at"] = entry.timestamp
-                summary["status"] = "completed" if entry.data.get("success") else "failed"
-            elif entry.event_type == LogEventType.AGENT_INVOKED.value:
-                summary["agents_invoked"].append(entry.agent)
-            elif entry.event_type == LogEventType.AUDIT_PERFORMED.value:
-                summary["audit_passed"] = entry.data.get("passed")
-            elif entry.event_type == LogEventType.CONFLICT_DETECTED.value:
-                summary["conflicts"].append(entry.data)
-            elif entry.event_type == LogEventType.ADAPTATION_APPLIED.value:
-                summary["adaptations"].append(entry.data)
+        for line in self._iter_lines(positions):
+            # Most of a task's events do not feed the summary; skip decoding
+            # those. Lines the pattern cannot read are decoded to find out.
+            match = _EVENT_TYPE_RE.search(line)
+            if match is not None and match.group(1) not in _SUMMARY_EVENTS:
+                continue
+            try:
+                entry = LogEntry.from_json(line)
+            except ValueError:
+                continue  # damaged line
+            handler = _SUMMARY_HANDLERS.get(entry.event_type)
+            if handler is not None:
+                handler(summary, entry)
 
         return summary
 
     def iter_entries(self) -> Iterator[LogEntry]:
         """Iterate over log entries without loading all into memory."""
-        if not self.log_file.exists():
-            return
-        with open(self.log_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    yield LogEntry.from_json(line)
+        self.flush()
+        for line in _mapped_lines(self.log_file):
+            yield LogEntry.from_json(line)
 
     def clear(self) -> None:
         """Clear the log file. Use with caution."""
+        self.close()
         if self.log_file.exists():
             self.log_file.unlink()
+        self.index_file.unlink(missing_ok=True)
+        self._reset_index()
@@ -6,18 +6,21 @@ Command-line interface for running VSM-orchestrated development tasks.
 """
 
 import argparse
-import asyncio
 import json
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from .vsm_loop import VSMLoop, VSMCycleResult
 from .state_manager import StateManager
-from .execution_log import ExecutionLog
+from .execution_log import ExecutionLog, format_timestamp
 
+# The control loop (and asyncio with it) is only imported when a task runs,
+# so --state, --log, --reset and --help start faster
+if TYPE_CHECKING:
+    from .vsm_loop import VSMCycleResult
 
-def print_result(result: VSMCycleResult, verbose: bool = False) -> None:
+
+def print_result(result: "VSMCycleResult", verbose: bool = False) -> None:
     """Print the result of a VSM cycle."""
     status = "SUCCESS" if result.success else "FAILED"
     print(f"\n{'='*60}")
@@ -94,7 +97,7 @@ def print_state(state_manager: StateManager) -> None:
 
     if metrics.active_adaptations:
         print(f"\n  Active Adaptations:")
-        for adaptation in metrics.active_adaptations:
+        for adaptation in metrics.active_adaptations.values():
             print(f"    - {adaptation.get('type')}: {adaptation.get('effect')}")
 
     # Agent registry
@@ -120,7 +123,7 @@ def print_log(log: ExecutionLog, count: int = 20) -> None:
         return
 
     for entry in entries:
-        timestamp = entry.timestamp[:19]  # Trim microseconds
+        timestamp = format_timestamp(entry.timestamp)[:19]  # Trim microseconds
         event = entry.event_type
         agent = entry.agent or "-"
         task = entry.task_id[:8] if entry.task_id else "-"
@@ -133,6 +136,8 @@ async def run_task(task: str, working_dir: Optional[Path] = None,
                    complexity_hint: Optional[str] = None,
                    verbose: bool = False) -> int:
     """Run a VSM-orchestrated task."""
+    from .vsm_loop import VSMLoop
+
     loop = VSMLoop(working_dir=working_dir)
 
     print(f"\nStarting VSM cycle for task:")
@@ -148,6 +153,8 @@ async def run_task(task: str, working_dir: Optional[Path] = None,
     except Exception as e:
         print(f"\nError during VSM cycle: {e}")
         return 1
+    finally:
+        await loop.aclose()
 
 
 def main():
@@ -224,8 +231,11 @@ Examples:
     if args.log:
         log = ExecutionLog()
         if args.json:
-            entries = log.read_recent(args.log_count)
-            print(json.dumps([e.__dict__ for e in entries], indent=2))
+            entries = [e.to_dict() for e in log.read_recent(args.log_count)]
+            # ISO timestamps throughout, as the hooks' lines already have
+            for entry in entries:
+                entry["timestamp"] = format_timestamp(entry["timestamp"])
+            print(json.dumps(entries, indent=2))
         else:
             print_log(log, args.log_count)
         return 0
@@ -235,7 +245,13 @@ Examples:
         parser.print_help()
         return 1
 
-    return asyncio.run(run_task(
+    try:
+        # Faster event loop for the agent subprocess I/O, when installed
+        from uvloop import run
+    except ImportError:  # uvloop is optional; fall back to asyncio's loop
+        from asyncio import run
+
+    return run(run_task(
         args.task,
         working_dir=args.dir,
         complexity_hint=complexity_hint,
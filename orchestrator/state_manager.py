@@ -5,12 +5,66 @@ Handles persistence of state files for cross-agent communication.
 State is stored in .claude/vsm-state/ directory.
 """
 
-import json
+import atexit
 import os
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Optional
-from dataclasses import dataclass, asdict, field
+from typing import Any, Callable, Optional
+from dataclasses import dataclass, field
+
+from ._json import encode, loads
+
+
+# State files written without indentation: the metrics are rewritten on
+# every update, and nobody edits either by hand (`--state` pretty-prints)
+_METRICS_FILE = "viability-metrics.json"
+_REGISTRY_FILE = "agent-registry.json"
+_COMPACT_FILES = frozenset({_REGISTRY_FILE, _METRICS_FILE})
+
+# A file modified this recently can be rewritten within the same mtime tick
+# (and on a reused inode, at the same size), so its stat is not trusted to
+# identify the content and the metrics read from it are not cached
+_RACY_NS = 1_000_000_000
+
+
+def now_iso() -> str:
+    """
+    Current UTC time in the format every state file is stamped with.
+
+    ISO 8601 with milliseconds and an explicit +00:00 offset, the same as
+    the hooks write into the metrics file and execution log.
+    """
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+# Smoothing factor of each exponentially averaged metric
+_EMA_ALPHAS = {
+    "completion_rate": 0.1,
+    "oscillation_rate": 0.15,
+    "audit_pass_rate": 0.15,
+}
+_AGENT_ERROR_ALPHA = 0.2
+
+
+def _ema(previous: float, sample: float, alpha: float) -> float:
+    """Fold one sample into an exponential moving average."""
+    return alpha * sample + (1 - alpha) * previous
+
+
+def _fold_samples(metrics: "ViabilityMetrics", samples: dict) -> None:
+    for name, sample in samples.items():
+        setattr(metrics, name, _ema(getattr(metrics, name), sample, _EMA_ALPHAS[name]))
+
+
+def _fold_agent_results(metrics: "ViabilityMetrics",
+                        results: list[tuple[str, bool]]) -> None:
+    # Rolling error rate per agent (simple exponential moving average)
+    errors = metrics.agent_errors
+    for agent_name, success in results:
+        errors[agent_name] = _ema(errors.get(agent_name, 0.0),
+                                  0.0 if success else 1.0, _AGENT_ERROR_ALPHA)
 
 
 def get_state_dir() -> Path:
@@ -20,7 +74,7 @@ def get_state_dir() -> Path:
     return state_dir
 
 
-@dataclass
+@dataclass(slots=True)
 class CurrentTask:
     """Active task definition."""
     id: str
@@ -32,7 +86,7 @@ class CurrentTask:
     metadata: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentStatus:
     """Status of an S1 agent."""
     name: str
@@ -43,7 +97,7 @@ class AgentStatus:
     success_count: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class ViabilityMetrics:
     """System health metrics for VSM viability."""
     window: str = "last_10_tasks"
@@ -53,14 +107,37 @@ class ViabilityMetrics:
     audit_pass_rate: float = 1.0
     s3_s4_conflicts: int = 0
     avg_cycle_iterations: float = 1.0
-    active_adaptations: list = field(default_factory=list)
+    active_adaptations: dict = field(default_factory=dict)  # {type: adaptation}
     last_updated: str = ""
 
+    def __post_init__(self):
+        # Older metrics files store active adaptations as a list
+        if isinstance(self.active_adaptations, list):
+            active = {}
+            for adaptation in self.active_adaptations:
+                active.setdefault(adaptation.get("type"), adaptation)
+            self.active_adaptations = active
+
     def update_timestamp(self):
-        self.last_updated = datetime.utcnow().isoformat()
+        self.last_updated = now_iso()
+
+    def copy(self) -> "ViabilityMetrics":
+        """Copy whose fields, error rates and adaptation records can be changed freely."""
+        return ViabilityMetrics(
+            window=self.window,
+            completion_rate=self.completion_rate,
+            agent_errors=dict(self.agent_errors),
+            oscillation_rate=self.oscillation_rate,
+            audit_pass_rate=self.audit_pass_rate,
+            s3_s4_conflicts=self.s3_s4_conflicts,
+            avg_cycle_iterations=self.avg_cycle_iterations,
+            active_adaptations={kind: dict(adaptation) for kind, adaptation
+                                in self.active_adaptations.items()},
+            last_updated=self.last_updated
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class S3Allocation:
     """Resource allocation decision from S3."""
     task_id: str
@@ -71,7 +148,7 @@ class S3Allocation:
     parallel_execution: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class S4Environment:
     """External context and research from S4."""
     task_id: str
@@ -89,6 +166,14 @@ class StateManager:
     def __init__(self, state_dir: Optional[Path] = None):
         self.state_dir = state_dir or get_state_dir()
         self.state_dir.mkdir(parents=True, exist_ok=True)
+        # Bumped on every metrics update so readers can drop derived caches
+        self.metrics_version = 0
+        # Parsed state files with updates not yet written, by filename
+        self._pending: dict[str, Any] = {}
+        self._lock = threading.RLock()
+        # Metrics last read from disk, and the file stat they were read at
+        self._metrics_snapshot: Optional[ViabilityMetrics] = None
+        self._metrics_stamp: Optional[tuple[int, int, int]] = None
 
     def _read_json(self, filename: str) -> Optional[dict]:
         """Read a JSON state file."""
@@ -96,19 +181,62 @@ class StateManager:
         if not filepath.exists():
             return None
         try:
-            with open(filepath, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
+            return loads(filepath.read_bytes())
+        except (ValueError, OSError):
             return None
 
     def _write_json(self, filename: str, data: Any) -> None:
-        """Write data to a JSON state file."""
+        """
+        Write data to a JSON state file.
+
+        Writes a temporary file alongside and renames it over the target, so
+        readers (including the hook scripts) never see a partial document.
+        """
+        # Dataclasses are serialized field by field, like asdict()
+        self._write_bytes(filename, encode(data, indent=filename not in _COMPACT_FILES))
+
+    def _write_bytes(self, filename: str, payload: bytes) -> None:
+        """Atomically replace a state file with already-encoded content."""
         filepath = self.state_dir / filename
-        with open(filepath, 'w') as f:
-            if hasattr(data, '__dataclass_fields__'):
-                json.dump(asdict(data), f, indent=2, default=str)
-            else:
-                json.dump(data, f, indent=2, default=str)
+        tmp = filepath.with_name(f"{filename}.{os.getpid()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, filepath)
+
+    def _hold(self, filename: str, obj: Any) -> None:
+        """Keep an updated state object in memory until the next flush()."""
+        if not self._pending:
+            atexit.register(self.flush)
+        self._pending[filename] = obj
+        if filename == _METRICS_FILE:
+            self.metrics_version += 1
+
+    def _mutate(self, filename: str, load: Callable[[], Any],
+                fn: Callable[[Any], Optional[bool]]) -> None:
+        """
+        Apply fn to a state file's contents and hold the result for flush().
+
+        The contents come from an earlier pending update if there is one,
+        otherwise from load(). Successive updates therefore share one parsed
+        object instead of each re-reading and re-writing the file, and the
+        lock keeps concurrent callers from losing each other's changes.
+        fn may return False to leave the file untouched.
+        """
+        with self._lock:
+            obj = self._pending.get(filename)
+            if obj is None:
+                obj = load()
+            if fn(obj) is not False:
+                self._hold(filename, obj)
+
+    def flush(self) -> None:
+        """Write pending state updates to disk."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            for filename, obj in pending.items():
+                self._write_json(filename, obj)
+            atexit.unregister(self.flush)
 
     # Current Task Management
     def get_current_task(self) -> Optional[CurrentTask]:
@@ -129,74 +257,121 @@ class StateManager:
             filepath.unlink()
 
     # Viability Metrics
+    def _load_metrics(self) -> ViabilityMetrics:
+        """
+        Read the metrics file, reusing the last parse while it is unchanged.
+
+        Callers get their own copy, which they are free to update in place.
+        """
+        try:
+            stat = os.stat(self.state_dir / _METRICS_FILE)
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp is not None and stamp == self._metrics_stamp:
+            return self._metrics_snapshot.copy()
+
+        data = self._read_json(_METRICS_FILE)
+        metrics = ViabilityMetrics(**data) if data else ViabilityMetrics()
+        if stamp is not None and time.time_ns() - stat.st_mtime_ns >= _RACY_NS:
+            self._metrics_snapshot, self._metrics_stamp = metrics.copy(), stamp
+        else:
+            self._metrics_snapshot = self._metrics_stamp = None
+        return metrics
+
     def get_viability_metrics(self) -> ViabilityMetrics:
-        """Get current viability metrics."""
-        data = self._read_json("viability-metrics.json")
-        if data:
-            return ViabilityMetrics(**data)
-        return ViabilityMetrics()
+        """
+        Get current viability metrics.
+
+        Includes updates not yet flushed; otherwise re-reads the file, since
+        the hook scripts update it from other processes.
+        """
+        with self._lock:
+            metrics = self._pending.get(_METRICS_FILE)
+            return metrics if metrics is not None else self._load_metrics()
 
     def update_viability_metrics(self, metrics: ViabilityMetrics) -> None:
-        """Update viability metrics."""
-        metrics.update_timestamp()
-        self._write_json("viability-metrics.json", metrics)
+        """Update viability metrics; the file is written by the next flush()."""
+        with self._lock:
+            metrics.update_timestamp()
+            self._hold(_METRICS_FILE, metrics)
+
+    def _update_metrics(self, fn: Callable[[ViabilityMetrics], None]) -> None:
+        """Apply fn to the current metrics and stamp them."""
+        def apply(metrics: ViabilityMetrics) -> None:
+            fn(metrics)
+            metrics.update_timestamp()
+        self._mutate(_METRICS_FILE, self._load_metrics, apply)
+
+    def record_samples(self, samples: dict) -> None:
+        """
+        Fold samples into the averaged metrics in a single update.
+
+        Args:
+            samples: Maps metric names (keys of _EMA_ALPHAS) to a 0.0-1.0 sample
+        """
+        self._update_metrics(lambda m: _fold_samples(m, samples))
 
     def record_agent_result(self, agent_name: str, success: bool) -> None:
         """Record an agent's task result for metrics."""
-        metrics = self.get_viability_metrics()
-
-        if agent_name not in metrics.agent_errors:
-            metrics.agent_errors[agent_name] = 0.0
-
-        # Update rolling error rate (simple exponential moving average)
-        alpha = 0.2
-        error_value = 0.0 if success else 1.0
-        metrics.agent_errors[agent_name] = (
-            alpha * error_value + (1 - alpha) * metrics.agent_errors[agent_name]
-        )
+        self.record_agent_results_batch([(agent_name, success)])
+
+    def record_agent_results_batch(self, results: list[tuple[str, bool]]) -> None:
+        """Record (agent_name, success) pairs for metrics in a single update."""
+        self._update_metrics(lambda m: _fold_agent_results(m, results))
+
+    def record_cycle_outcome(self, agent_results: list[tuple[str, bool]],
+                             audit_passed: bool, oscillation: bool = False) -> None:
+        """
+        Record everything a VSM cycle contributes to the metrics at once.
+
+        Args:
+            agent_results: (agent_name, success) for each S1 invocation
+            audit_passed: Whether the S3* audit passed
+            oscillation: Whether the audit detected oscillation
+        """
+        completed = audit_passed and all(success for _, success in agent_results)
+        samples = {
+            "audit_pass_rate": 1.0 if audit_passed else 0.0,
+            "completion_rate": 1.0 if completed else 0.0,
+        }
+        if oscillation:
+            samples["oscillation_rate"] = 1.0
 
-        self.update_viability_metrics(metrics)
+        def apply(metrics: ViabilityMetrics) -> None:
+            _fold_agent_results(metrics, agent_results)
+            _fold_samples(metrics, samples)
+        self._update_metrics(apply)
 
     def record_task_completion(self, success: bool) -> None:
         """Record task completion for metrics."""
-        metrics = self.get_viability_metrics()
-
-        # Update rolling completion rate
-        alpha = 0.1
-        completion_value = 1.0 if success else 0.0
-        metrics.completion_rate = (
-            alpha * completion_value + (1 - alpha) * metrics.completion_rate
-        )
-
-        self.update_viability_metrics(metrics)
+        self.record_samples({"completion_rate": 1.0 if success else 0.0})
 
     def record_oscillation(self) -> None:
         """Record an oscillation event (reverted changes)."""
-        metrics = self.get_viability_metrics()
-        alpha = 0.15
-        metrics.oscillation_rate = alpha + (1 - alpha) * metrics.oscillation_rate
-        self.update_viability_metrics(metrics)
+        self.record_samples({"oscillation_rate": 1.0})
 
     def record_audit_result(self, passed: bool) -> None:
         """Record an audit result."""
-        metrics = self.get_viability_metrics()
-        alpha = 0.15
-        audit_value = 1.0 if passed else 0.0
-        metrics.audit_pass_rate = (
-            alpha * audit_value + (1 - alpha) * metrics.audit_pass_rate
-        )
-        self.update_viability_metrics(metrics)
+        self.record_samples({"audit_pass_rate": 1.0 if passed else 0.0})
 
     def record_s3_s4_conflict(self) -> None:
         """Record a conflict between S3 and S4."""
-        metrics = self.get_viability_metrics()
-        metrics.s3_s4_conflicts += 1
-        self.update_viability_metrics(metrics)
+        self._update_metrics(
+            lambda m: setattr(m, "s3_s4_conflicts", m.s3_s4_conflicts + 1)
+        )
 
     # Agent Registry
     def get_agent_registry(self) -> dict:
         """Get the registry of available S1 agents."""
-        data = self._read_json("agent-registry.json")
+        with self._lock:
+            registry = self._pending.get(_REGISTRY_FILE)
+            if registry is not None:
+                return registry
+        return self._load_registry()
+
+    def _load_registry(self) -> dict:
+        data = self._read_json(_REGISTRY_FILE)
         if data:
             return data
         # Return default registry
@@ -204,68 +379,28 @@ class StateManager:
 
     def _create_default_registry(self) -> dict:
         """Create the default agent registry."""
-        registry = {
-            "agents": {
-                "generalist-coder": {
-                    "type": "generalist",
-                    "status": "available",
-                    "capabilities": ["general coding", "simple fixes", "small features"]
-                },
-                "code-writer": {
-                    "type": "functional",
-                    "status": "available",
-                    "capabilities": ["implementation", "new features", "code generation"]
-                },
-                "tester": {
-                    "type": "functional",
-                    "status": "available",
-                    "capabilities": ["unit tests", "integration tests", "test coverage"]
-                },
-                "reviewer": {
-                    "type": "functional",
-                    "status": "available",
-                    "capabilities": ["code review", "best practices", "quality checks"]
-                },
-                "documenter": {
-                    "type": "functional",
-                    "status": "available",
-                    "capabilities": ["documentation", "comments", "API docs"]
-                },
-                "frontend": {
-                    "type": "domain",
-                    "status": "available",
-                    "capabilities": ["UI/UX", "React", "CSS", "accessibility"]
-                },
-                "backend": {
-                    "type": "domain",
-                    "status": "available",
-                    "capabilities": ["APIs", "services", "business logic"]
-                },
-                "database": {
-                    "type": "domain",
-                    "status": "available",
-                    "capabilities": ["SQL", "migrations", "data modeling", "queries"]
-                },
-                "infrastructure": {
-                    "type": "domain",
-                    "status": "available",
-                    "capabilities": ["DevOps", "CI/CD", "deployment", "containers"]
-                }
-            },
-            "last_updated": datetime.utcnow().isoformat()
-        }
-        self._write_json("agent-registry.json", registry)
-        return registry
+        from ._default_registry import DEFAULT_AGENTS_JSON
+
+        timestamp = now_iso()
+        self._write_bytes(
+            _REGISTRY_FILE,
+            b'{"agents":' + DEFAULT_AGENTS_JSON
+            + b',"last_updated":' + encode(timestamp) + b'}'
+        )
+        return {"agents": loads(DEFAULT_AGENTS_JSON), "last_updated": timestamp}
 
     def update_agent_status(self, agent_name: str, status: str,
                            current_task: Optional[str] = None) -> None:
-        """Update an agent's status."""
-        registry = self.get_agent_registry()
-        if agent_name in registry["agents"]:
-            registry["agents"][agent_name]["status"] = status
-            registry["agents"][agent_name]["current_task"] = current_task
-            registry["last_updated"] = datetime.utcnow().isoformat()
-            self._write_json("agent-registry.json", registry)
+        """Update an agent's status; the file is written by the next flush()."""
+        def apply(registry: dict) -> bool:
+            agent = registry["agents"].get(agent_name)
+            if agent is None:
+                return False
+            agent["status"] = status
+            agent["current_task"] = current_task
+            registry["last_updated"] = now_iso()
+            return True
+        self._mutate(_REGISTRY_FILE, self._load_registry, apply)
 
     # S3 Allocations
     def get_s3_allocation(self) -> Optional[S3Allocation]:
@@ -294,6 +429,7 @@ class StateManager:
     # Utility Methods
     def get_all_state(self) -> dict:
         """Get all state as a dictionary."""
+        self.flush()
         return {
             "current_task": self._read_json("current-task.json"),
             "viability_metrics": self._read_json("viability-metrics.json"),
@@ -304,9 +440,15 @@ class StateManager:
 
     def reset_state(self) -> None:
         """Reset all state (for testing or fresh start)."""
+        with self._lock:
+            if self._pending:
+                self._pending.clear()
+                atexit.unregister(self.flush)
+            self._metrics_snapshot = self._metrics_stamp = None
         for filename in ["current-task.json", "viability-metrics.json",
                         "agent-registry.json", "s3-allocations.json",
                         "s4-environment.json"]:
             filepath = self.state_dir / filename
             if filepath.exists():
                 filepath.unlink()
+        self.metrics_version += 1
@@ -5,23 +5,193 @@ Implements the Viable Systems Model control loop for orchestrating agents.
 """
 
 import asyncio
-import json
+import hashlib
 import os
-import subprocess
-from dataclasses import dataclass, field
-from datetime import datetime
+import secrets
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import List, Optional
 
-from .state_manager import (
-    StateManager, CurrentTask, S3Allocation, S4Environment, ViabilityMetrics
-)
-from .execution_log import ExecutionLog, LogEventType
-from .complexity_analyzer import ComplexityAnalyzer, Complexity
+from .state_manager import StateManager, CurrentTask, S3Allocation, S4Environment, now_iso
+from .execution_log import ExecutionLog
 from .adaptation import AdaptationEngine
+from ._json import dumps, loads
+
+
+# Agent prompts, filled in with str.format() on each invocation
+_S4_PROMPT = """Analyze this development task and provide strategic intelligence.
+
+Task: {task}
+
+{metrics}
+
+Provide your analysis as JSON with:
+- task_analysis (summary, scope, domains_involved)
+- environment_context (relevant_files, dependencies, constraints)
+- external_research (best_practices, patterns, documentation)
+- risks (with severity and mitigation)
+- opportunities
+- strategic_recommendation (approach, priorities, complexity_assessment, specialist_recommendation)
+
+Write your analysis to .claude/vsm-state/s4-environment.json"""
+
+_S3_PROMPT = """Determine resource allocation for this task.
+
+Task: {task}
+
+S4 Strategic Analysis:
+{s4_analysis}
+
+Read the agent registry from .claude/vsm-state/agent-registry.json
+{metrics}
+
+Complexity threshold adjustment: {complexity_adj} (negative means use specialists earlier)
+
+Provide your allocation decision as JSON with:
+- complexity (simple|medium|complex)
+- complexity_confidence
+- complexity_rationale
+- selected_agents (list with agent, role, order, task_focus)
+- execution_mode (sequential|parallel|mixed)
+- execution_plan (steps with agents and actions)
+- synergies
+- risks
+- escalation_triggers
+
+Write your allocation to .claude/vsm-state/s3-allocations.json"""
 
+_S2_PROMPT = """Create an execution schedule for the allocated agents.
 
-@dataclass
+S3 Allocation:
+{s3_allocation}
+
+{coordination_note}
+
+Provide your coordination plan as JSON with:
+- execution_schedule (phases with agents, actions, files_locked, completion_signal)
+- parallel_groups (if applicable)
+- conflict_zones (resources with potential conflicts)
+- handoff_protocols (from agent to agent)
+- monitoring_points
+
+Focus on preventing conflicts and oscillation between agents."""
+
+_PIPELINE_PROMPT = """Plan this development task in three phases and return all of them at once.
+
+Task: {task}
+
+Read the agent registry from .claude/vsm-state/agent-registry.json
+{metrics}
+
+Complexity threshold adjustment: {complexity_adj} (negative means use specialists earlier)
+
+{coordination_note}
+
+Return a single JSON object with exactly these keys:
+- s4: strategic analysis with
+  - analysis (summary of task, scope and domains involved)
+  - risks (with severity and mitigation)
+  - opportunities
+  - recommended_approach (approach, priorities, complexity_assessment, specialist_recommendation)
+- s3: resource allocation, based on s4, with
+  - complexity (simple|medium|complex)
+  - selected_agents (list with agent, role, order, task_focus)
+  - rationale
+- s2: execution schedule for the s3 allocation, with
+  - execution_schedule (phases with agents, actions, files_locked, completion_signal)
+  - parallel_groups (if applicable)
+  - conflict_zones (resources with potential conflicts)
+  - handoff_protocols (from agent to agent)
+  - monitoring_points
+
+Focus the schedule on preventing conflicts and oscillation between agents."""
+
+# Stand in for inlined metrics when a caller does not supply a snapshot,
+# worded as each prompt originally was
+_METRICS_FILE_NOTE = "Read viability metrics from .claude/vsm-state/viability-metrics.json"
+_S4_METRICS_FILE_NOTE = (
+    "Read the current viability metrics from "
+    ".claude/vsm-state/viability-metrics.json if it exists."
+)
+
+# Agent that answers the fused S4/S3/S2 prompt
+_PIPELINE_AGENT = "system3-control"
+
+_S2_COORDINATION_NOTE = (
+    "IMPORTANT: Increased coordination is required due to recent oscillation issues."
+)
+
+_S1_PROMPT = """Execute your assigned task.
+
+Task: {task}
+Focus: {focus}
+
+Read the current task from .claude/vsm-state/current-task.json
+Read your coordination plan from .claude/vsm-state/coordination-plan.json if it exists
+
+Complete your work and report results as JSON with:
+- status (completed|partial|blocked)
+- changes_made
+- files_modified
+- verification
+- blockers (if any)
+- handoff_notes"""
+
+_AUDIT_PROMPT = """Audit the work completed by S1 agents.
+
+Task: {task}
+
+S1 Results:
+{results_summary}
+
+Perform a quality audit and report as JSON with:
+- audit_passed (true|false)
+- overall_score
+- verification (files_verified, changes_confirmed, discrepancies)
+- quality_assessment (code_quality, conventions_followed, issues_found)
+- completeness (requirements_met, missing_items)
+- oscillation_check (oscillation_detected, evidence)
+- recommendations
+- metrics_update"""
+
+_S5_APPROVAL_PROMPT = """Review and approve S3's resource allocation.
+
+Task: {task}
+
+S4 Analysis:
+{s4_analysis}
+
+S3 Allocation:
+{s3_allocation}
+
+This approval is required due to recent S3/S4 conflicts.
+
+Decide whether to approve this allocation. Return JSON with:
+- approved (true|false)
+- rationale
+- modifications (if any changes needed)"""
+
+_S5_CONFLICT_PROMPT = """Resolve conflicts between S3 (Control) and S4 (Intelligence).
+
+Conflicts detected:
+{conflicts}
+
+Read context from:
+- .claude/vsm-state/s3-allocations.json
+- .claude/vsm-state/s4-environment.json
+- .claude/vsm-state/viability-metrics.json
+
+Provide resolution as JSON with:
+- decision
+- rationale
+- policy_update (optional)
+- s3_guidance
+- s4_guidance
+- priority_order"""
+
+
+
+@dataclass(slots=True)
 class AgentResult:
     """Result from an agent invocation."""
     agent: str
@@ -31,7 +201,7 @@ class AgentResult:
     metadata: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class VSMCycleResult:
     """Result of a complete VSM cycle."""
     task_id: str
@@ -44,6 +214,153 @@ class VSMCycleResult:
     s1_results: List[AgentResult] = field(default_factory=list)
 
 
+async def _send_prompt(process: asyncio.subprocess.Process, prompt: str) -> None:
+    """Write the prompt to an agent's stdin and close it."""
+    try:
+        process.stdin.write(prompt.encode())
+        await process.stdin.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # the agent exited without reading; its status says why
+    finally:
+        process.stdin.close()
+
+
+# Seconds an agent gets to exit after SIGTERM before it is killed
+_STOP_GRACE = 5.0
+
+
+async def _stop_process(process: asyncio.subprocess.Process) -> None:
+    """Terminate an agent process and wait for it, killing it if it lingers."""
+    if process.returncode is None:
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            pass  # already exited, just not reaped yet
+    try:
+        await asyncio.wait_for(process.wait(), _STOP_GRACE)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+
+def _metrics_note(metrics: Optional[str], fallback: str = _METRICS_FILE_NOTE) -> str:
+    """Prompt line giving the agent the cycle's metrics snapshot, or fallback."""
+    if metrics is None:
+        return fallback
+    return f"Current viability metrics:\n{metrics}"
+
+
+def _approach_dict(approach) -> dict:
+    """
+    Normalize S4's recommended approach to its object form.
+
+    S4 writes either a strategic_recommendation object or plain text; text
+    becomes the object's approach field.
+    """
+    if isinstance(approach, dict):
+        return approach
+    return {"approach": approach} if approach else {}
+
+
+def _parse_object(output: str) -> Optional[dict]:
+    """Parse an agent reply that should be a JSON object, or return None."""
+    # Most failed replies are CLI errors or prose; skip the parse for those
+    if not output.lstrip().startswith("{"):
+        return None
+    try:
+        data = loads(output)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _plan_keys(value) -> Optional[set]:
+    """
+    Read a schedule field holding one or several phase ids or file names.
+
+    A single value counts as a one-element list and a missing one as empty.
+    Returns None when the field holds anything other than strings and ints.
+    """
+    if value is None:
+        return set()
+    if isinstance(value, (str, int)):
+        return {value}
+    if isinstance(value, list) and all(isinstance(v, (str, int)) for v in value):
+        return set(value)
+    return None
+
+
+def _parallel_groups(s2_plan: dict, assignments: list) -> list:
+    """
+    Split (agent, task_focus) assignments into groups that can run together.
+
+    Uses the parallel_groups of S2's plan when it has them. Otherwise
+    consecutive agents share a group as long as the files their schedule
+    phases lock are disjoint and none depends on a phase already in the
+    group. Groups keep the allocation order. A schedule that cannot be read
+    that way runs every agent on its own.
+    """
+    plan = s2_plan.get("plan")
+    plan = (_parse_object(plan) if isinstance(plan, str) else None) or {}
+
+    def name(agent: str) -> str:
+        return str(agent).removeprefix("s1-")
+
+    declared = {}
+    for index, group in enumerate(plan.get("parallel_groups") or []):
+        members = group.get("agents", []) if isinstance(group, dict) else group
+        if isinstance(members, list):
+            for agent in members:
+                if isinstance(agent, str):
+                    declared.setdefault(name(agent), index)
+
+    if declared:
+        groups, placed = [], {}
+        for assignment in assignments:
+            index = declared.get(name(assignment[0]))
+            if index is None:
+                groups.append([assignment])
+            elif index in placed:
+                placed[index].append(assignment)
+            else:
+                placed[index] = [assignment]
+                groups.append(placed[index])
+        return groups
+
+    # Files locked by, and phase of, each agent in the execution schedule
+    locks, phases, depends = {}, {}, {}
+    for phase in plan.get("execution_schedule") or []:
+        if not isinstance(phase, dict):
+            continue
+        agents = _plan_keys(phase.get("agents"))
+        phase_locks = _plan_keys(phase.get("files_locked"))
+        phase_depends = _plan_keys(phase.get("depends_on"))
+        phase_id = phase.get("phase")
+        if None in (agents, phase_locks, phase_depends) \
+                or not isinstance(phase_id, (str, int, type(None))):
+            return [[assignment] for assignment in assignments]
+        for agent in agents:
+            if isinstance(agent, str) and name(agent) not in phases:
+                locks[name(agent)] = phase_locks
+                phases[name(agent)] = phase_id
+                depends[name(agent)] = phase_depends
+
+    groups = []
+    group_locks, group_phases = set(), set()
+    for assignment in assignments:
+        agent = name(assignment[0])
+        agent_locks = locks.get(agent, set())
+        if groups and group_locks.isdisjoint(agent_locks) \
+                and group_phases.isdisjoint(depends.get(agent, set())):
+            groups[-1].append(assignment)
+        else:
+            groups.append([assignment])
+            group_locks, group_phases = set(), set()
+        group_locks |= agent_locks
+        group_phases.add(phases.get(agent))
+    return groups
+
+
 class VSMLoop:
     """
     Implements the VSM control loop.
@@ -58,16 +375,31 @@ class VSMLoop:
     """
 
     def __init__(self, working_dir: Optional[Path] = None,
-                 claude_command: str = "claude"):
+                 claude_command: str = "claude",
+                 max_concurrent_agents: int = 4,
+                 cache_prompts: bool = False,
+                 fused_pipeline: bool = False):
         """
         Initialize the VSM loop.
 
         Args:
             working_dir: Working directory for the task
             claude_command: Command to invoke Claude Code CLI
+            max_concurrent_agents: Most agent processes running at once
+            cache_prompts: Reuse the successful result of an identical earlier
+                invocation (same agent and prompt) instead of re-running it
+            fused_pipeline: Ask for the S4 analysis, S3 allocation and S2 plan
+                in one agent invocation instead of three, when no S5
+                approval step has to sit between them
         """
         self.working_dir = working_dir or Path.cwd()
         self.claude_command = claude_command
+        self.fused_pipeline = fused_pipeline
+        self._agent_slots = asyncio.Semaphore(max_concurrent_agents)
+        self._processes: set = set()
+        self._prompt_cache: Optional[dict[bytes, AgentResult]] = (
+            {} if cache_prompts else None
+        )
         self.state = StateManager()
         self.log = ExecutionLog()
         self.adaptation = AdaptationEngine(self.state)
@@ -89,11 +421,14 @@ class VSMLoop:
         if not task_id:
             task_id = self._generate_task_id()
 
+        # One timestamp for everything the cycle stamps up front
+        started_at = now_iso()
+
         # Initialize task state
         current_task = CurrentTask(
             id=task_id,
             description=task,
-            created_at=datetime.utcnow().isoformat(),
+            created_at=started_at,
             status="in_progress"
         )
         self.state.set_current_task(current_task)
@@ -103,28 +438,51 @@ class VSMLoop:
             # Check for and apply adaptations
             metrics = self.state.get_viability_metrics()
             adaptations = self.adaptation.analyze_metrics(metrics)
+            applied = []
             if adaptations:
-                self.adaptation.apply_adaptations(adaptations)
+                applied = self.adaptation.apply_adaptations(
+                    adaptations, applied_at=started_at
+                )
                 for a in adaptations:
                     self.log.log_adaptation(a.type.value, a.trigger, a.effect)
+                # Persist before the agents run; hooks update metrics meanwhile
+                self.state.flush()
+
+            # One metrics snapshot, inlined into every planning prompt
+            metrics_blob = dumps(self.state.get_viability_metrics())
+
+            # Phases 1-3 in a single invocation, when enabled and possible
+            fused = None
+            require_s5 = self.adaptation.should_require_s5_approval()
+            if self.fused_pipeline and not require_s5:
+                fused = await self._invoke_analysis_pipeline(
+                    task, task_id, metrics=metrics_blob
+                )
 
-            # Phase 1: S4 analyzes environment & task
-            s4_result = await self._invoke_s4(task, task_id)
-
-            # Phase 2: S3 determines resource allocation
-            s3_result = await self._invoke_s3(task, s4_result, task_id)
+            if fused is not None:
+                s4_result, s3_result, s2_result = fused
+            else:
+                # Phase 1: S4 analyzes environment & task
+                s4_result = await self._invoke_s4(task, task_id, metrics=metrics_blob)
 
-            # Check if S5 approval needed (due to adaptation)
-            if self.adaptation.should_require_s5_approval():
-                s5_approval = await self._invoke_s5_for_approval(
-                    task, s4_result, s3_result, task_id
+                # Phase 2: S3 determines resource allocation
+                s3_result = await self._invoke_s3(
+                    task, s4_result, task_id, metrics=metrics_blob
                 )
-                if not s5_approval:
-                    # S5 rejected, need to re-plan
-                    s3_result = await self._invoke_s3(task, s4_result, task_id)
 
-            # Phase 3: S2 creates execution plan
-            s2_result = await self._invoke_s2(s3_result, task_id)
+                # Check if S5 approval needed (due to adaptation)
+                if require_s5:
+                    s5_approval = await self._invoke_s5_for_approval(
+                        task, s4_result, s3_result, task_id
+                    )
+                    if not s5_approval:
+                        # S5 rejected, need to re-plan
+                        s3_result = await self._invoke_s3(
+                            task, s4_result, task_id, metrics=metrics_blob
+                        )
+
+                # Phase 3: S2 creates execution plan
+                s2_result = await self._invoke_s2(s3_result, task_id)
 
             # Phase 4: S1 agents execute
             s1_results = await self._execute_s1_agents(
@@ -163,7 +521,7 @@ class VSMLoop:
                 agents_invoked=[r.agent for r in s1_results],
                 audit_passed=audit_result.get("audit_passed"),
                 conflicts=conflicts,
-                adaptations=[a.to_dict() for a in adaptations],
+                adaptations=applied,
                 s1_results=s1_results
             )
 
@@ -175,25 +533,23 @@ class VSMLoop:
                                         summary=str(e))
             raise
 
-    async def _invoke_s4(self, task: str, task_id: str) -> dict:
-        """Invoke S4 (Intelligence) for strategic analysis."""
-        self.log.log_agent_invoked("system4-strategy", task_id, task[:200])
+        finally:
+            # Write the end-of-cycle metrics updates in one go
+            self.state.flush()
 
-        prompt = f"""Analyze this development task and provide strategic intelligence.
-
-Task: {task}
-
-Read the current viability metrics from .claude/vsm-state/viability-metrics.json if it exists.
+    async def _invoke_s4(self, task: str, task_id: str,
+                         metrics: Optional[str] = None) -> dict:
+        """
+        Invoke S4 (Intelligence) for strategic analysis.
 
-Provide your analysis as JSON with:
-- task_analysis (summary, scope, domains_involved)
-- environment_context (relevant_files, dependencies, constraints)
-- external_research (best_practices, patterns, documentation)
-- risks (with severity and mitigation)
-- opportunities
-- strategic_recommendation (approach, priorities, complexity_assessment, specialist_recommendation)
+        metrics is a JSON snapshot of the viability metrics to inline in the
+        prompt; without one the agent is told to read the metrics file.
+        """
+        self.log.log_agent_invoked("system4-strategy", task_id, task[:200])
 
-Write your analysis to .claude/vsm-state/s4-environment.json"""
+        prompt = _S4_PROMPT.format(
+            task=task, metrics=_metrics_note(metrics, _S4_METRICS_FILE_NOTE)
+        )
 
         result = await self._invoke_agent("system4-strategy", prompt)
 
@@ -204,42 +560,24 @@ Write your analysis to .claude/vsm-state/s4-environment.json"""
                 "analysis": s4_env.analysis,
                 "risks": s4_env.risks,
                 "opportunities": s4_env.opportunities,
-                "recommended_approach": s4_env.recommended_approach
+                "recommended_approach": _approach_dict(s4_env.recommended_approach)
             }
         return {"analysis": result.output}
 
     async def _invoke_s3(self, task: str, s4_analysis: dict,
-                        task_id: str) -> dict:
-        """Invoke S3 (Control) for resource allocation."""
+                        task_id: str, metrics: Optional[str] = None) -> dict:
+        """Invoke S3 (Control) for resource allocation (metrics as for S4)."""
         self.log.log_agent_invoked("system3-control", task_id)
 
         # Get complexity adjustment from adaptations
         complexity_adj = self.adaptation.get_complexity_adjustment()
 
-        prompt = f"""Determine resource allocation for this task.
-
-Task: {task}
-
-S4 Strategic Analysis:
-{json.dumps(s4_analysis, indent=2)}
-
-Read the agent registry from .claude/vsm-state/agent-registry.json
-Read viability metrics from .claude/vsm-state/viability-metrics.json
-
-Complexity threshold adjustment: {complexity_adj} (negative means use specialists earlier)
-
-Provide your allocation decision as JSON with:
-- complexity (simple|medium|complex)
-- complexity_confidence
-- complexity_rationale
-- selected_agents (list with agent, role, order, task_focus)
-- execution_mode (sequential|parallel|mixed)
-- execution_plan (steps with agents and actions)
-- synergies
-- risks
-- escalation_triggers
-
-Write your allocation to .claude/vsm-state/s3-allocations.json"""
+        prompt = _S3_PROMPT.format(
+            task=task,
+            s4_analysis=dumps(s4_analysis, indent=True),
+            metrics=_metrics_note(metrics),
+            complexity_adj=complexity_adj
+        )
 
         result = await self._invoke_agent("system3-control", prompt)
 
@@ -259,24 +597,76 @@ Write your allocation to .claude/vsm-state/s3-allocations.json"""
 
         increase_s2 = self.adaptation.should_increase_s2()
 
-        prompt = f"""Create an execution schedule for the allocated agents.
-
-S3 Allocation:
-{json.dumps(s3_allocation, indent=2)}
+        prompt = _S2_PROMPT.format(
+            s3_allocation=dumps(s3_allocation, indent=True),
+            coordination_note=_S2_COORDINATION_NOTE if increase_s2 else ""
+        )
 
-{"IMPORTANT: Increased coordination is required due to recent oscillation issues." if increase_s2 else ""}
+        result = await self._invoke_agent("system2-coordination", prompt)
+        return {"plan": result.output}
 
-Provide your coordination plan as JSON with:
-- execution_schedule (phases with agents, actions, files_locked, completion_signal)
-- parallel_groups (if applicable)
-- conflict_zones (resources with potential conflicts)
-- handoff_protocols (from agent to agent)
-- monitoring_points
+    async def _invoke_analysis_pipeline(self, task: str, task_id: str,
+                                        metrics: Optional[str] = None
+                                        ) -> Optional[tuple[dict, dict, dict]]:
+        """
+        Get the S4, S3 and S2 results from one fused invocation.
 
-Focus on preventing conflicts and oscillation between agents."""
+        Returns them shaped like _invoke_s4, _invoke_s3 and _invoke_s2 do,
+        after recording the analysis and allocation in the state files the
+        separate phases would have written. Returns None if the reply is not
+        the expected envelope, so the caller can run the phases separately.
+        """
+        self.log.log_agent_invoked(_PIPELINE_AGENT, task_id, task[:200])
+
+        prompt = _PIPELINE_PROMPT.format(
+            task=task,
+            metrics=_metrics_note(metrics),
+            complexity_adj=self.adaptation.get_complexity_adjustment(),
+            coordination_note=(
+                _S2_COORDINATION_NOTE if self.adaptation.should_increase_s2() else ""
+            )
+        )
 
-        result = await self._invoke_agent("system2-coordination", prompt)
-        return {"plan": result.output}
+        result = await self._invoke_agent(_PIPELINE_AGENT, prompt)
+
+        envelope = _parse_object(result.output) if result.success else None
+        if envelope is None:
+            return None
+        s4, s3, s2 = envelope.get("s4"), envelope.get("s3"), envelope.get("s2")
+        if not (isinstance(s4, dict) and isinstance(s3, dict) and isinstance(s2, dict)):
+            return None
+
+        approach = _approach_dict(s4.get("recommended_approach"))
+        s4_result = {
+            "analysis": s4.get("analysis", ""),
+            "risks": s4.get("risks", []),
+            "opportunities": s4.get("opportunities", []),
+            "recommended_approach": approach
+        }
+        s3_result = {
+            "complexity": s3.get("complexity", "medium"),
+            "selected_agents": s3.get("selected_agents", []),
+            "rationale": s3.get("rationale", "")
+        }
+
+        created_at = now_iso()
+        self.state.set_s4_environment(S4Environment(
+            task_id=task_id,
+            analysis=s4_result["analysis"],
+            risks=s4_result["risks"],
+            opportunities=s4_result["opportunities"],
+            recommended_approach=approach,
+            created_at=created_at
+        ))
+        self.state.set_s3_allocation(S3Allocation(
+            task_id=task_id,
+            complexity=s3_result["complexity"],
+            selected_agents=s3_result["selected_agents"],
+            rationale=s3_result["rationale"],
+            created_at=created_at
+        ))
+
+        return s4_result, s3_result, {"plan": dumps(s2)}
 
     async def _execute_s1_agents(self, s2_plan: dict, s3_allocation: dict,
                                  task_id: str) -> List[AgentResult]:
@@ -288,38 +678,62 @@ Focus on preventing conflicts and oscillation between agents."""
         if isinstance(agents, str):
             # Parse if it's a string
             try:
-                agents = json.loads(agents)
-            except:
+                agents = loads(agents)
+            except ValueError:
                 agents = [{"agent": "generalist-coder", "role": "primary"}]
 
+        # Entries are either agent names or {"agent", "task_focus", ...}
+        # objects; settle the shape once, before anything iterates them
+        agents = [a if isinstance(a, dict) else {"agent": a} for a in agents]
+        assignments = [(a.get("agent", "generalist-coder"), a.get("task_focus", ""))
+                       for a in agents]
+
         # Check if we should parallelize
-        should_parallel = self.adaptation.should_parallelize()
+        if self.adaptation.should_parallelize():
+            groups = _parallel_groups(s2_plan, assignments)
+        else:
+            groups = [[assignment] for assignment in assignments]
 
-        for agent_info in agents:
-            agent_name = agent_info.get("agent", agent_info) if isinstance(agent_info, dict) else agent_info
+        for group in groups:
+            outcomes = await asyncio.gather(
+                *(self._run_s1_assignment(agent_name, task_focus, task_id)
+                  for agent_name, task_focus in group),
+                return_exceptions=True
+            )
 
-            # Check if review step should be added
-            if self.adaptation.should_add_review_step(agent_name):
-                review_result = await self._invoke_s1_agent(
-                    "s1-reviewer", task_id,
-                    f"Review before {agent_name} executes"
+            for (agent_name, _), outcome in zip(group, outcomes):
+                if isinstance(outcome, BaseException):
+                    outcome = [AgentResult(agent=f"s1-{agent_name}", success=False,
+                                           output="", error=str(outcome))]
+                results.extend(outcome)
+
+                # Update agent status once the whole group has finished
+                self.state.update_agent_status(
+                    agent_name,
+                    "available",
+                    None
                 )
-                results.append(review_result)
 
-            # Invoke the agent
-            task_focus = agent_info.get("task_focus", "") if isinstance(agent_info, dict) else ""
-            result = await self._invoke_s1_agent(
-                f"s1-{agent_name}", task_id, task_focus
-            )
-            results.append(result)
+        return results
 
-            # Update agent status
-            self.state.update_agent_status(
-                agent_name,
-                "available",
-                None
+    async def _run_s1_assignment(self, agent_name: str, task_focus: str,
+                                 task_id: str) -> List[AgentResult]:
+        """Run one S1 agent, preceded by a review step if one is required."""
+        results = []
+
+        # Check if review step should be added
+        if self.adaptation.should_add_review_step(agent_name):
+            review_result = await self._invoke_s1_agent(
+                "s1-reviewer", task_id,
+                f"Review before {agent_name} executes"
             )
+            results.append(review_result)
 
+        # Invoke the agent
+        result = await self._invoke_s1_agent(
+            f"s1-{agent_name}", task_id, task_focus
+        )
+        results.append(result)
         return results
 
     async def _invoke_s1_agent(self, agent_name: str, task_id: str,
@@ -330,21 +744,7 @@ Focus on preventing conflicts and oscillation between agents."""
         current_task = self.state.get_current_task()
         task_desc = current_task.description if current_task else ""
 
-        prompt = f"""Execute your assigned task.
-
-Task: {task_desc}
-Focus: {focus}
-
-Read the current task from .claude/vsm-state/current-task.json
-Read your coordination plan from .claude/vsm-state/coordination-plan.json if it exists
-
-Complete your work and report results as JSON with:
-- status (completed|partial|blocked)
-- changes_made
-- files_modified
-- verification
-- blockers (if any)
-- handoff_notes"""
+        prompt = _S1_PROMPT.format(task=task_desc, focus=focus)
 
         result = await self._invoke_agent(agent_name, prompt)
 
@@ -363,106 +763,63 @@ Complete your work and report results as JSON with:
             for r in s1_results
         ])
 
-        prompt = f"""Audit the work completed by S1 agents.
-
-Task: {task}
-
-S1 Results:
-{results_summary}
-
-Perform a quality audit and report as JSON with:
-- audit_passed (true|false)
-- overall_score
-- verification (files_verified, changes_confirmed, discrepancies)
-- quality_assessment (code_quality, conventions_followed, issues_found)
-- completeness (requirements_met, missing_items)
-- oscillation_check (oscillation_detected, evidence)
-- recommendations
-- metrics_update"""
+        prompt = _AUDIT_PROMPT.format(task=task, results_summary=results_summary)
 
         result = await self._invoke_agent("system3-audit", prompt)
 
         # Parse audit result
-        try:
-            audit_data = json.loads(result.output)
-            self.log.log_audit(task_id,
-                              audit_data.get("audit_passed", True),
-                              audit_data.get("quality_assessment", {}).get("issues_found", []))
-            return audit_data
-        except:
+        audit_data = _parse_object(result.output)
+        if audit_data is None:
             return {"audit_passed": result.success}
+        try:
+            issues = audit_data.get("quality_assessment", {}).get("issues_found", [])
+        except AttributeError:  # quality_assessment is not an object
+            issues = []
+        self.log.log_audit(task_id, audit_data.get("audit_passed", True), issues)
+        return audit_data
 
     async def _invoke_s5_for_approval(self, task: str, s4_analysis: dict,
                                       s3_allocation: dict, task_id: str) -> bool:
         """Invoke S5 for approval of S3 allocation."""
         self.log.log_agent_invoked("system5-policy", task_id)
 
-        prompt = f"""Review and approve S3's resource allocation.
-
-Task: {task}
-
-S4 Analysis:
-{json.dumps(s4_analysis, indent=2)}
-
-S3 Allocation:
-{json.dumps(s3_allocation, indent=2)}
-
-This approval is required due to recent S3/S4 conflicts.
-
-Decide whether to approve this allocation. Return JSON with:
-- approved (true|false)
-- rationale
-- modifications (if any changes needed)"""
+        prompt = _S5_APPROVAL_PROMPT.format(
+            task=task,
+            s4_analysis=dumps(s4_analysis, indent=True),
+            s3_allocation=dumps(s3_allocation, indent=True)
+        )
 
         result = await self._invoke_agent("system5-policy", prompt)
 
-        try:
-            decision = json.loads(result.output)
-            approved = decision.get("approved", True)
-            self.log.log_policy_decision(
-                task_id,
-                "approved" if approved else "rejected",
-                decision.get("rationale", "")
-            )
-            return approved
-        except:
+        decision = _parse_object(result.output)
+        if decision is None:
             return True
+        approved = decision.get("approved", True)
+        self.log.log_policy_decision(
+            task_id,
+            "approved" if approved else "rejected",
+            decision.get("rationale", "")
+        )
+        return approved
 
     async def _invoke_s5_for_conflict(self, conflicts: List[dict],
                                        task_id: str) -> dict:
         """Invoke S5 to resolve S3/S4 conflicts."""
         self.log.log_agent_invoked("system5-policy", task_id)
 
-        prompt = f"""Resolve conflicts between S3 (Control) and S4 (Intelligence).
-
-Conflicts detected:
-{json.dumps(conflicts, indent=2)}
-
-Read context from:
-- .claude/vsm-state/s3-allocations.json
-- .claude/vsm-state/s4-environment.json
-- .claude/vsm-state/viability-metrics.json
-
-Provide resolution as JSON with:
-- decision
-- rationale
-- policy_update (optional)
-- s3_guidance
-- s4_guidance
-- priority_order"""
+        prompt = _S5_CONFLICT_PROMPT.format(conflicts=dumps(conflicts, indent=True))
 
         result = await self._invoke_agent("system5-policy", prompt)
 
-        try:
-            decision = json.loads(result.output)
-            self.log.log_policy_decision(
-                task_id,
-                decision.get("decision", "resolved"),
-                decision.get("rationale", "")
-            )
-            return decision
-        except:
+        decision = _parse_object(result.output)
+        if decision is None:
             return {"decision": "resolved"}
+        self.log.log_policy_decision(
+            task_id,
+            decision.get("decision", "resolved"),
+            decision.get("rationale", "")
+        )
+        return decision
 
     def _detect_conflicts(self, s3_result: dict, s4_result: dict) -> List[dict]:
         """Detect conflicts between S3 and S4 positions."""
@@ -470,12 +827,9 @@ Provide resolution as JSON with:
 
         # Check complexity disagreement
         s3_complexity = s3_result.get("complexity", "medium")
-        s4_recommendation = s4_result.get("recommended_approach", "")
-
-        if isinstance(s4_recommendation, dict):
-            s4_complexity = s4_recommendation.get("complexity_assessment", "medium")
-        else:
-            s4_complexity = "medium"
+        s4_complexity = s4_result.get("recommended_approach", {}).get(
+            "complexity_assessment", "medium"
+        )
 
         if s3_complexity != s4_complexity:
             conflicts.append({
@@ -490,28 +844,20 @@ Provide resolution as JSON with:
     def _update_metrics(self, s1_results: List[AgentResult],
                        audit_result: dict) -> None:
         """Update viability metrics based on results."""
-        # Record agent results
-        for result in s1_results:
-            agent_name = result.agent.replace("s1-", "")
-            self.state.record_agent_result(agent_name, result.success)
-
-        # Record audit result
-        audit_passed = audit_result.get("audit_passed", True)
-        self.state.record_audit_result(audit_passed)
-
-        # Record task completion
-        overall_success = all(r.success for r in s1_results) and audit_passed
-        self.state.record_task_completion(overall_success)
-
-        # Check for oscillation
-        if audit_result.get("oscillation_check", {}).get("oscillation_detected"):
-            self.state.record_oscillation()
+        self.state.record_cycle_outcome(
+            [(r.agent.removeprefix("s1-"), r.success) for r in s1_results],
+            audit_passed=audit_result.get("audit_passed", True),
+            oscillation=bool(
+                audit_result.get("oscillation_check", {}).get("oscillation_detected")
+            )
+        )
 
     def _build_summary(self, s1_results: List[AgentResult],
                       audit_result: dict) -> str:
         """Build a summary of the VSM cycle."""
-        agents = ", ".join([r.agent for r in s1_results])
-        successes = sum(1 for r in s1_results if r.success)
+        successes = 0
+        for r in s1_results:
+            successes += r.success
         total = len(s1_results)
         audit_status = "passed" if audit_result.get("audit_passed") else "failed"
 
@@ -519,46 +865,74 @@ Provide resolution as JSON with:
 
     def _generate_task_id(self) -> str:
         """Generate a unique task ID."""
-        import hashlib
-        timestamp = datetime.utcnow().isoformat()
-        return hashlib.sha256(timestamp.encode()).hexdigest()[:8]
+        return secrets.token_hex(4)
 
     async def _invoke_agent(self, agent_name: str, prompt: str) -> AgentResult:
         """
         Invoke a Claude Code agent.
 
         This uses the Claude Code CLI with the --agent flag to invoke
-        a specific agent defined in the plugin.
+        a specific agent defined in the plugin. The prompt is sent on
+        stdin rather than argv, which keeps it out of the process list and
+        clear of argument size limits.
         """
+        key = None
+        if self._prompt_cache is not None:
+            key = hashlib.blake2b(f"{agent_name}\0{prompt}".encode(),
+                                  digest_size=16).digest()
+            cached = self._prompt_cache.get(key)
+            if cached is not None:
+                return replace(cached, metadata=dict(cached.metadata))
+
         try:
             # Build the command
             cmd = [
                 self.claude_command,
                 "--print",
-                "--agent", agent_name,
-                prompt
+                "--agent", agent_name
             ]
 
-            # Run the command
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(self.working_dir)
-            )
-
-            stdout, stderr = await process.communicate()
+            # Run the command, once a slot is free
+            async with self._agent_slots:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(self.working_dir)
+                )
+                self._processes.add(process)
+                try:
+                    # Feed the prompt and drain both pipes while the agent runs
+                    _, stdout, stderr, _ = await asyncio.gather(
+                        _send_prompt(process, prompt),
+                        process.stdout.read(),
+                        process.stderr.read(),
+                        process.wait()
+                    )
+                except BaseException:
+                    # Cancelled or failed mid-run; don't leave the agent behind
+                    await _stop_process(process)
+                    raise
+                finally:
+                    # Still tracked if stopping it was itself interrupted,
+                    # so aclose() gets another go
+                    if process.returncode is not None:
+                        self._processes.discard(process)
 
             success = process.returncode == 0
             output = stdout.decode() if stdout else ""
             error = stderr.decode() if stderr and not success else None
 
-            return AgentResult(
+            result = AgentResult(
                 agent=agent_name,
                 success=success,
                 output=output,
                 error=error
             )
+            if key is not None and success:
+                self._prompt_cache[key] = replace(result, metadata={})
+            return result
 
         except Exception as e:
             return AgentResult(
@@ -567,3 +941,9 @@ Provide resolution as JSON with:
                 output="",
                 error=str(e)
             )
+
+    async def aclose(self) -> None:
+        """Terminate agent processes that are still running."""
+        processes = list(self._processes)
+        self._processes.clear()
+        await asyncio.gather(*(_stop_process(p) for p in processes))
@@ -0,0 +1,66 @@
+"""Tests for applying adaptations to the viability metrics."""
+
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from orchestrator.adaptation import Adaptation, AdaptationEngine, AdaptationType
+from orchestrator.state_manager import StateManager
+
+STAMP = "2026-01-02T03:04:05.678+00:00"
+
+
+class ApplyAdaptationsTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state = StateManager(Path(tmp.name))
+        self.addCleanup(self.state.flush)
+        self.engine = AdaptationEngine(self.state)
+
+    def adaptation(self, kind: AdaptationType) -> Adaptation:
+        return Adaptation(type=kind, trigger="test", effect="test",
+                          parameters=(("target_agent", "s1-backend"),))
+
+    def test_records_are_stamped_with_applied_at(self):
+        records = self.engine.apply_adaptations(
+            [self.adaptation(AdaptationType.ADD_REVIEW_STEP),
+             self.adaptation(AdaptationType.TIGHTEN_S3_STAR)],
+            applied_at=STAMP,
+        )
+        self.assertEqual([r["applied_at"] for r in records], [STAMP, STAMP])
+        self.assertEqual(records[0]["parameters"], {"target_agent": "s1-backend"})
+
+        active = self.state.get_viability_metrics().active_adaptations
+        self.assertEqual(set(active), {"add_review_step", "tighten_s3_star"})
+        self.assertEqual(active["add_review_step"]["applied_at"], STAMP)
+        self.assertTrue(self.engine.should_add_review_step("s1-backend"))
+
+    def test_active_adaptations_keep_their_stamp(self):
+        self.engine.apply_adaptations(
+            [self.adaptation(AdaptationType.ADD_REVIEW_STEP)], applied_at=STAMP
+        )
+        records = self.engine.apply_adaptations(
+            [self.adaptation(AdaptationType.ADD_REVIEW_STEP)],
+            applied_at="2026-06-01T00:00:00.000+00:00",
+        )
+        self.assertEqual(records[0]["applied_at"], "")
+        active = self.state.get_viability_metrics().active_adaptations
+        self.assertEqual(active["add_review_step"]["applied_at"], STAMP)
+
+    def test_default_stamp_is_aware_utc(self):
+        records = self.engine.apply_adaptations(
+            [self.adaptation(AdaptationType.PARALLELIZE_S1)]
+        )
+        applied_at = datetime.fromisoformat(records[0]["applied_at"])
+        self.assertEqual(applied_at.utcoffset().total_seconds(), 0)
+        self.assertEqual(len(records[0]["applied_at"]), len(STAMP))
+
+    def test_nothing_to_apply(self):
+        self.assertEqual(self.engine.apply_adaptations([], applied_at=STAMP), [])
+        self.assertEqual(self.state.get_viability_metrics().active_adaptations, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Tests for the execution log's index and its interplay with log rolling."""
+
+import gzip
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from orchestrator._json import loads
+from orchestrator.execution_log import ExecutionLog
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent / "hooks"
+
+
+class ExecutionLogTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_dir = Path(tmp.name)
+
+    def open_log(self) -> ExecutionLog:
+        log = ExecutionLog(state_dir=self.state_dir)
+        self.addCleanup(log._save_index)
+        self.addCleanup(log.close)
+        return log
+
+    def append_raw(self, data: bytes) -> None:
+        with open(self.state_dir / "execution-log.jsonl", "ab") as f:
+            f.write(data)
+
+
+class IndexRebuildTests(ExecutionLogTestCase):
+    def test_truncated_log_is_reindexed(self):
+        log = self.open_log()
+        for n in range(5):
+            log.log_task_started(f"old-{n}", "before truncation")
+        self.assertEqual(len(log.read_task("old-0")), 1)
+
+        os.truncate(log.log_file, 0)
+        log.log_task_started("new", "after truncation")
+        log.log_task_completed("new")
+
+        self.assertEqual(log.read_task("old-0"), [])
+        self.assertEqual([e.event_type for e in log.read_task("new")],
+                         ["task_started", "task_completed"])
+        self.assertEqual(log.get_task_summary("new")["status"], "completed")
+
+    def test_saved_index_is_dropped_for_a_replaced_log(self):
+        log = self.open_log()
+        log.log_task_started("first", "indexed and saved")
+        log.read_task("first")
+        log.close()
+        log._save_index()
+        self.assertTrue(log.index_file.exists())
+
+        replacement = self.state_dir / "replacement.jsonl"
+        replacement.write_bytes(
+            b'{"event_type": "task_started", "task_id": "second", '
+            b'"session_id": "s"}\n'
+        )
+        os.replace(replacement, log.log_file)
+
+        reopened = self.open_log()
+        self.assertEqual(reopened.read_task("first"), [])
+        self.assertEqual(len(reopened.read_task("second")), 1)
+
+    def test_damaged_lines_are_skipped(self):
+        log = self.open_log()
+        log.log_task_started("task", "surrounded by damage")
+        log.flush()
+        self.append_raw(
+            b'{"event_type": "x", "task_id": "bad\\u12", "session_id": "s"}\n'
+            b'{"event_type": null, "task_id": "task", "session_id": "s"}\n'
+            b'[1, 2]\n'
+            b'{"event_type": "agent_invoked", "task_id": "task", "sess\n'
+        )
+        log.log_task_completed("task")
+
+        summary = log.get_task_summary("task")
+        self.assertEqual(summary["status"], "completed")
+        self.assertIsNotNone(summary["started_at"])
+        self.assertEqual([e.event_type for e in log.read_task("task")],
+                         ["task_started", "", "task_completed"])
+        self.assertEqual(len(log.read_recent(10)), 3)
+
+
+# Appends numbered hook lines through _jsonl, rolling the log once it passes
+# a few kilobytes so that segments are cut while the parent keeps writing
+_HOOK_WRITER = """
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+import _jsonl
+_jsonl.LOG_ROLL_BYTES = 4096
+path, name = Path(sys.argv[2]), sys.argv[3]
+for n in range(int(sys.argv[4])):
+    if n % 2:
+        _jsonl.append_line(path, _jsonl.encode({"event_type": "tool_used", "id": f"{name}-{n}"}))
+    else:
+        _jsonl.enqueue(path, _jsonl.encode({"event_type": "tool_used", "id": f"{name}-{n}"}))
+        _jsonl.flush()
+"""
+
+
+class RollTests(ExecutionLogTestCase):
+    def read_everything(self) -> list[dict]:
+        records = []
+        for path in sorted(self.state_dir.glob("execution-log*")):
+            if path.suffix == ".idx":
+                continue
+            if path.name.endswith(".gz"):
+                data = gzip.decompress(path.read_bytes())
+            else:
+                data = path.read_bytes()
+            records.extend(loads(line) for line in data.splitlines() if line)
+        return records
+
+    def test_concurrent_append_and_roll_loses_nothing(self):
+        log = self.open_log()
+        writers = [
+            subprocess.Popen([sys.executable, "-c", _HOOK_WRITER, str(HOOKS_DIR),
+                              str(log.log_file), f"hook{n}", "400"])
+            for n in range(3)
+        ]
+        for n in range(200):
+            log.log_agent_invoked("s1-test", f"task-{n}")
+        for writer in writers:
+            self.assertEqual(writer.wait(timeout=60), 0)
+        # The hooks have rolled the file the log first wrote to by now
+        for n in range(200, 400):
+            log.log_agent_invoked("s1-test", f"task-{n}")
+        log.close()
+
+        records = self.read_everything()
+        hook_ids = [r["id"] for r in records if r.get("event_type") == "tool_used"]
+        task_ids = [r["task_id"] for r in records if r.get("event_type") == "agent_invoked"]
+        self.assertEqual(len(hook_ids), len(set(hook_ids)))
+        self.assertEqual(set(hook_ids),
+                         {f"hook{w}-{n}" for w in range(3) for n in range(400)})
+        self.assertEqual(sorted(task_ids), sorted(f"task-{n}" for n in range(400)))
+        self.assertTrue(any(p.name.endswith(".gz") for p in self.state_dir.iterdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
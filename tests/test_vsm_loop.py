@@ -0,0 +1,61 @@
+"""Tests for grouping S1 assignments from S2's execution plan."""
+
+import json
+import unittest
+
+from orchestrator.vsm_loop import _parallel_groups
+
+ASSIGNMENTS = [("s1-backend", "api"), ("s1-frontend", "ui"), ("s1-tester", "tests")]
+SERIAL = [[assignment] for assignment in ASSIGNMENTS]
+
+
+def plan(**fields) -> dict:
+    return {"plan": json.dumps(fields)}
+
+
+class ParallelGroupsTests(unittest.TestCase):
+    def test_disjoint_locks_share_a_group(self):
+        groups = _parallel_groups(plan(execution_schedule=[
+            {"phase": 1, "agents": ["backend"], "files_locked": ["src/api.py"]},
+            {"phase": 2, "agents": ["frontend"], "files_locked": ["src/ui.py"]},
+            {"phase": 3, "agents": ["tester"], "depends_on": [1, 2]},
+        ]), ASSIGNMENTS)
+        self.assertEqual(groups, [ASSIGNMENTS[:2], ASSIGNMENTS[2:]])
+
+    def test_declared_groups_are_used(self):
+        groups = _parallel_groups(plan(parallel_groups=[
+            {"agents": ["s1-backend", "s1-tester"]},
+            ["s1-frontend"],
+        ]), ASSIGNMENTS)
+        self.assertEqual(groups, [[ASSIGNMENTS[0], ASSIGNMENTS[2]], [ASSIGNMENTS[1]]])
+
+    def test_string_fields_count_as_one_element(self):
+        groups = _parallel_groups(plan(execution_schedule=[
+            {"phase": 1, "agents": "backend", "files_locked": "src/api.py"},
+            {"phase": 2, "agents": "frontend", "files_locked": "src/ui.py"},
+            {"phase": 3, "agents": "tester", "files_locked": "src/api.py"},
+        ]), ASSIGNMENTS)
+        self.assertEqual(groups, [ASSIGNMENTS[:2], ASSIGNMENTS[2:]])
+
+    def test_unhashable_fields_fall_back_to_serial(self):
+        for schedule in (
+            [{"agents": ["backend"], "phase": {"n": 1}}],
+            [{"agents": ["backend"], "phase": 1, "depends_on": [{"p": 0}]}],
+            [{"agents": ["backend"], "phase": 1, "files_locked": {"src": 1}}],
+            [{"agents": [["backend"]], "phase": 1}],
+        ):
+            with self.subTest(schedule=schedule):
+                groups = _parallel_groups(plan(execution_schedule=schedule), ASSIGNMENTS)
+                self.assertEqual(groups, SERIAL)
+
+    def test_unreadable_plans_are_ignored(self):
+        for s2_plan in ({}, {"plan": "not json"}, {"plan": "[1, 2]"},
+                        plan(execution_schedule="backend"),
+                        plan(execution_schedule=[None, 3, "phase"])):
+            with self.subTest(s2_plan=s2_plan):
+                groups = _parallel_groups(s2_plan, ASSIGNMENTS)
+                self.assertEqual([a for group in groups for a in group], ASSIGNMENTS)
+
+
+if __name__ == "__main__":
+    unittest.main()